@@ -0,0 +1,123 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+"""Content-hash fingerprinting of static files.
+
+``url_for('static', filename='css/spy.css')`` returns ``/static/css/spy.<hash>.css``. The hash changes
+together with the file content, so fingerprinted URLs are served with far-future ``Cache-Control: immutable`` headers
+and browsers never need to revalidate them.
+"""
+import hashlib
+import os
+import re
+import threading
+from functools import wraps
+
+HASH_LENGTH = 10
+FINGERPRINT_RE = re.compile(r'^(?P<name>.+)\.(?P<hash>[0-9a-f]{%d})(?P<ext>\.[^./]+)$' % HASH_LENGTH)
+
+
+def content_hash(filename):
+    with open(filename, 'rb') as fd:
+        return hashlib.sha1(fd.read()).hexdigest()[:HASH_LENGTH]
+
+
+def split_fingerprint(static_folder, filename):
+    """Return (original filename, hash) of a fingerprinted filename, or (filename, None) if it is not fingerprinted."""
+    match = FINGERPRINT_RE.match(filename)
+
+    if match and not os.path.isfile(os.path.join(static_folder, filename)):
+        original = match.group('name') + match.group('ext')
+
+        if os.path.isfile(os.path.join(static_folder, original)):
+            return original, match.group('hash')
+
+    return filename, None
+
+
+class StaticFingerprint(object):
+    """Rewrites static URLs to fingerprinted ones and serves them with immutable caching headers.
+
+    Disabled when ``STATIC_FINGERPRINT`` is False or the app runs in debug mode.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self._hashes = {}
+        self._lock = threading.Lock()
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        app.config.setdefault('STATIC_FINGERPRINT', True)
+        app.config.setdefault('STATIC_FINGERPRINT_MAX_AGE', 365 * 24 * 3600)
+        app.extensions['static_fingerprint'] = self
+        app.url_defaults(self._url_defaults)
+        app.view_functions['static'] = self._static_view(app.view_functions['static'])
+
+    @property
+    def enabled(self):
+        return self.app.config['STATIC_FINGERPRINT'] and not self.app.debug
+
+    def file_hash(self, filename):
+        """Return the content hash of a static file, recomputed only when its size or mtime changes."""
+        path = os.path.join(self.app.static_folder, filename)
+
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+
+        key = (stat.st_mtime_ns, stat.st_size)
+        cached = self._hashes.get(filename)
+
+        if cached is None or cached[0] != key:
+            cached = (key, content_hash(path))
+
+            with self._lock:
+                self._hashes[filename] = cached
+
+        return cached[1]
+
+    def fingerprint(self, filename):
+        """Return the fingerprinted name of a static file, or filename unchanged if it does not exist."""
+        digest = self.file_hash(filename)
+
+        if digest is None:
+            return filename
+
+        name, ext = os.path.splitext(filename)
+
+        return '%s.%s%s' % (name, digest, ext)
+
+    def manifest(self):
+        """Return a mapping of every file under the static folder to the name url_for('static', ...) links to."""
+        manifest = {}
+        root = self.app.static_folder
+
+        for dirpath, _dirnames, filenames in os.walk(root):
+            for name in filenames:
+                filename = os.path.relpath(os.path.join(dirpath, name), root).replace(os.sep, '/')
+                manifest[filename] = self.fingerprint(filename) if self.enabled else filename
+
+        return manifest
+
+    def _url_defaults(self, endpoint, values):
+        if endpoint == 'static' and 'filename' in values and self.enabled:
+            values['filename'] = self.fingerprint(values['filename'])
+
+    def _static_view(self, view):
+        @wraps(view)
+        def wrapper(filename):
+            original, digest = split_fingerprint(self.app.static_folder, filename)
+            response = view(filename=original)
+
+            # A stale fingerprint is still served, just not cached forever
+            if digest is not None and digest == self.file_hash(original):
+                response.headers['Cache-Control'] = 'public, max-age=%d, immutable' % (
+                    self.app.config['STATIC_FINGERPRINT_MAX_AGE'])
+
+            return response
+
+        return wrapper
@@ -0,0 +1,216 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+"""Benchmarks of page rendering, sitemap generation and freezing.
+
+Routes are requested through the Flask test client in every language from LANGS, once with the page cache disabled
+(full rendering) and once with it enabled. Results are written as JSON, a previous result can be passed with
+``--compare`` and the run fails when any metric got slower by more than ``--threshold``::
+
+    python bench.py -o bench.json
+    python bench.py --compare bench.json --threshold 0.2
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from views import app, LANGS, page_cache, get_sitemap_pages
+
+ROUTES = ['/', '/index.html', '/sitemap.xml'] + [
+    '/%s/%s' % (lang, page) for lang in LANGS for page in ('index.html', 'support.html')]
+# Metrics compared with --compare, bigger is worse for all of them. Tail latencies are too noisy to gate on.
+COMPARED_METRICS = ('p50', 'seconds', 'peak_bytes', 'bytes')
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100.0 * (len(values) - 1))))
+
+    return values[index]
+
+
+def summarize(durations):
+    """Latency summary in milliseconds."""
+    return {
+        'p50': percentile(durations, 50) * 1000,
+        'p90': percentile(durations, 90) * 1000,
+        'p99': percentile(durations, 99) * 1000,
+        'mean': sum(durations) / len(durations) * 1000,
+        'count': len(durations),
+    }
+
+
+def time_requests(client, url, iterations):
+    durations = []
+
+    for _i in range(iterations):
+        start = time.perf_counter()
+        response = client.get(url)
+        durations.append(time.perf_counter() - start)
+        assert response.status_code in (200, 302), (url, response.status)
+
+    return durations
+
+
+def measure_memory(client, url, iterations):
+    """Peak and retained traced memory per request, in bytes."""
+    client.get(url)
+    tracemalloc.start()
+
+    try:
+        start, _peak = tracemalloc.get_traced_memory()
+        peak = 0
+
+        for _i in range(iterations):
+            tracemalloc.reset_peak()
+            client.get(url)
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - start)
+
+        retained = tracemalloc.get_traced_memory()[0] - start
+    finally:
+        tracemalloc.stop()
+
+    return {'peak_bytes': peak, 'retained_bytes': retained // iterations}
+
+
+def bench_routes(iterations):
+    client = app.test_client()
+    results = {}
+
+    for url in ROUTES:
+        app.config['PAGE_CACHE'] = False
+        result = {'render': summarize(time_requests(client, url, iterations))}
+        result.update(measure_memory(client, url, max(1, iterations // 10)))
+        app.config['PAGE_CACHE'] = True
+        page_cache.clear()
+        result['cached'] = summarize(time_requests(client, url, iterations))
+        results[url] = result
+
+    return results
+
+
+def bench_sitemap(iterations):
+    durations = []
+
+    with app.test_request_context():
+        for _i in range(iterations):
+            start = time.perf_counter()
+            get_sitemap_pages()
+            durations.append(time.perf_counter() - start)
+
+    return summarize(durations)
+
+
+def bench_freeze():
+    """Wall-clock time and output size of a full serial freeze into a temporary directory."""
+    import freezer
+
+    destination = tempfile.mkdtemp(prefix='spy-bench-')
+    app.config['FREEZER_DESTINATION'] = destination
+
+    try:
+        start = time.perf_counter()
+        timings = freezer.freeze_serial()
+        seconds = time.perf_counter() - start
+        size = sum(os.path.getsize(os.path.join(dirpath, name))
+                   for dirpath, _dirnames, filenames in os.walk(destination) for name in filenames)
+    finally:
+        shutil.rmtree(destination)
+
+    return {'seconds': seconds, 'urls': len(timings), 'bytes': size}
+
+
+def run(iterations, freeze=True):
+    results = {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'iterations': iterations,
+            'langs': list(LANGS),
+        },
+        'routes': bench_routes(iterations),
+        'sitemap': bench_sitemap(iterations),
+    }
+
+    if freeze:
+        results['freeze'] = bench_freeze()
+
+    return results
+
+
+def flatten(results, prefix=''):
+    """Yield (dotted path, value) of all numeric metrics."""
+    for key, value in results.items():
+        if isinstance(value, dict):
+            for item in flatten(value, prefix + key + '.'):
+                yield item
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield prefix + key, value
+
+
+def compare(current, baseline, threshold):
+    """Return a list of (metric, baseline, current) that regressed by more than threshold (0.2 = 20 %)."""
+    baseline = dict(flatten(baseline))
+    regressions = []
+
+    for metric, value in flatten(current):
+        if metric.startswith('meta.') or metric.rsplit('.', 1)[-1] not in COMPARED_METRICS:
+            continue
+
+        previous = baseline.get(metric)
+
+        if previous and value > previous * (1 + threshold):
+            regressions.append((metric, previous, value))
+
+    return regressions
+
+
+def print_results(results):
+    print('%-28s %10s %10s %10s %10s %12s' % ('route', 'p50 ms', 'p99 ms', 'cached p50', 'cached p99', 'peak KiB'))
+
+    for url, result in results['routes'].items():
+        print('%-28s %10.2f %10.2f %10.3f %10.3f %12.1f' % (
+            url, result['render']['p50'], result['render']['p99'], result['cached']['p50'], result['cached']['p99'],
+            result['peak_bytes'] / 1024.0))
+
+    print('sitemap build: p50 %.2f ms' % results['sitemap']['p50'])
+
+    if 'freeze' in results:
+        print('freeze: %(seconds).2f s, %(urls)d urls, %(bytes)d bytes' % results['freeze'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark page rendering, sitemap generation and freezing.')
+    parser.add_argument('-n', '--iterations', type=int, default=50, help='requests per route (default: %(default)s)')
+    parser.add_argument('-o', '--output', help='write results as JSON into this file')
+    parser.add_argument('--compare', metavar='BASELINE', help='JSON results of a previous run to compare with')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='allowed slowdown against the baseline, 0.2 means 20 %% (default: %(default)s)')
+    parser.add_argument('--no-freeze', action='store_true', help='skip the full freeze benchmark')
+    args = parser.parse_args()
+
+    results = run(args.iterations, freeze=not args.no_freeze)
+    print_results(results)
+
+    if args.output:
+        with open(args.output, 'w') as fd:
+            json.dump(results, fd, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as fd:
+            regressions = compare(results, json.load(fd), args.threshold)
+
+        for metric, previous, value in regressions:
+            print('REGRESSION %s: %.3f -> %.3f' % (metric, previous, value))
+
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+"""Process-wide cache of compiled translation catalogs.
+
+Flask-Babel 1.x loads and parses the ``messages.mo`` file again in every request. The registry loads the catalogs of
+all languages once, keeps them for the lifetime of the process and hands them to Flask-Babel for each request. A
+language without a catalog gets an empty one, so it is not looked up on disk again. A catalog is reloaded only when
+its ``messages.mo`` changes. That is checked after ``reload()``, called when the page cache notices changed files, at
+most once per ``CATALOG_CHECK_INTERVAL`` seconds when the page cache is disabled, and in every request in debug mode.
+"""
+import os
+import threading
+import time
+from babel import support
+from flask import current_app, has_request_context, request
+
+
+class CatalogRegistry(object):
+    """Compiled catalogs of all languages, loaded at startup."""
+
+    def __init__(self, app=None, langs=()):
+        self.app = None
+        self._catalogs = {}
+        # Time the catalog of a language was compared with the files on disk, since the last reload()
+        self._checked = {}
+        self._lock = threading.Lock()
+
+        if app is not None:
+            self.init_app(app, langs)
+
+    def init_app(self, app, langs=()):
+        self.app = app
+        app.config.setdefault('CATALOG_CHECK_INTERVAL', 1)
+        app.extensions['catalogs'] = self
+
+        for lang in langs:
+            self.get(lang)
+
+    def _mtimes(self, lang):
+        """Return a tuple of messages.mo mtimes of lang in all translation directories, None for missing files."""
+        babel = self.app.extensions['babel']
+        mtimes = []
+
+        for dirname in babel.translation_directories:
+            try:
+                mtimes.append(os.stat(os.path.join(dirname, lang, 'LC_MESSAGES', babel.domain + '.mo')).st_mtime_ns)
+            except OSError:
+                mtimes.append(None)
+
+        return tuple(mtimes)
+
+    def _load(self, lang):
+        """Load translations of lang the same way Flask-Babel does."""
+        babel = self.app.extensions['babel']
+        translations = support.Translations()
+
+        for dirname in babel.translation_directories:
+            catalog = support.Translations.load(dirname, [lang], babel.domain)
+            translations.merge(catalog)
+
+            if hasattr(catalog, 'plural'):
+                translations.plural = catalog.plural
+
+        return translations
+
+    def get(self, lang):
+        """Return translations of lang, loading them only on first use or after the catalog changed on disk."""
+        cached = self._catalogs.get(lang)
+        checked = self._checked.get(lang)
+        now = time.time()
+
+        if cached is not None and checked is not None and not self.app.debug:
+            # Without the page cache nothing calls reload(), the files are checked at an interval instead
+            if self.app.config.get('PAGE_CACHE') or now - checked < self.app.config['CATALOG_CHECK_INTERVAL']:
+                return cached[1]
+
+        mtimes = self._mtimes(lang)
+
+        if cached is None or cached[0] != mtimes:
+            with self._lock:
+                cached = self._catalogs[lang] = (mtimes, self._load(lang))
+
+        self._checked[lang] = now
+
+        return cached[1]
+
+    def reload(self):
+        """Compare the catalogs with the files on disk again on next use."""
+        self._checked = {}
+
+    def activate(self, lang):
+        """Make Flask-Babel use the cached translations of lang in the current request."""
+        request.babel_translations = self.get(str(lang))
+
+
+def activate(lang):
+    """Use the cached translations of lang in the current request, if the app has a catalog registry."""
+    registry = current_app.extensions.get('catalogs')
+
+    if registry is not None and has_request_context():
+        registry.activate(lang)
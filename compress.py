@@ -0,0 +1,122 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+"""Precompress frozen text files.
+
+Writes ``.gz`` (and ``.br`` when the brotli package is installed) siblings next to every HTML, CSS, JS, SVG and XML
+file, so web servers can serve them without compressing on the fly (nginx ``gzip_static``/``brotli_static``).
+"""
+import argparse
+import gzip
+import multiprocessing
+import os
+
+try:
+    import brotli
+except ImportError:  # brotli is optional
+    brotli = None
+
+EXTENSIONS = ('.html', '.css', '.js', '.svg', '.xml', '.json', '.ics', '.atom')
+
+
+def _gzip(data):
+    # mtime=0 keeps the output reproducible between builds
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _brotli(data):
+    return brotli.compress(data, quality=11)
+
+
+def encoders():
+    """Return a tuple of (suffix, compress function) pairs available in this environment."""
+    available = [('.gz', _gzip)]
+
+    if brotli is not None:
+        available.append(('.br', _brotli))
+
+    return tuple(available)
+
+
+def compress_file(filename):
+    """Write compressed siblings of filename. Returns a list of (sibling, original size, compressed size).
+
+    Siblings that are newer than filename are left untouched. When compression does not save space, the sibling is
+    not written and a stale one is removed.
+    """
+    results = []
+    mtime = os.path.getmtime(filename)
+    data = None
+
+    for suffix, compress in encoders():
+        sibling = filename + suffix
+
+        if os.path.isfile(sibling) and os.path.getmtime(sibling) >= mtime:
+            continue
+
+        if data is None:
+            with open(filename, 'rb') as fd:
+                data = fd.read()
+
+        compressed = compress(data)
+
+        if len(compressed) >= len(data):
+            if os.path.isfile(sibling):
+                os.remove(sibling)
+            continue
+
+        # Replaced, not written into, the sibling may be hard linked by dedupe.py
+        with open(sibling + '.tmp', 'wb') as fd:
+            fd.write(compressed)
+
+        os.replace(sibling + '.tmp', sibling)
+
+        results.append((sibling, len(data), len(compressed)))
+
+    return results
+
+
+def find_files(root, extensions=EXTENSIONS):
+    """Yield files under root that should be precompressed."""
+    for dirpath, _dirnames, filenames in os.walk(root):
+        for name in sorted(filenames):
+            if name.endswith(extensions):
+                yield os.path.join(dirpath, name)
+
+
+def remove_orphans(root):
+    """Remove compressed siblings whose original file no longer exists."""
+    for dirpath, _dirnames, filenames in os.walk(root):
+        for name in filenames:
+            original = os.path.join(dirpath, name[:-3])
+
+            if name.endswith(('.gz', '.br')) and original.endswith(EXTENSIONS) and not os.path.exists(original):
+                os.remove(os.path.join(dirpath, name))
+
+
+def compress_tree(root, jobs=None):
+    """Precompress all text files under root using jobs worker processes. Returns the list of written siblings."""
+    remove_orphans(root)
+
+    with multiprocessing.Pool(jobs) as pool:
+        results = pool.map(compress_file, list(find_files(root)), chunksize=8)
+
+    return [result for file_results in results for result in file_results]
+
+
+def print_summary(results):
+    original = sum(size for _sibling, size, _compressed in results)
+    compressed = sum(size for _sibling, _size, size in results)
+    print('Compressed %d files: %d -> %d bytes' % (len(results), original, compressed))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Write precompressed .gz/.br siblings of frozen files.')
+    parser.add_argument('root', nargs='?', default='docs', help='directory to compress (default: %(default)s)')
+    parser.add_argument('-j', '--jobs', type=int, default=0, help='number of worker processes, 0 for one per CPU')
+    args = parser.parse_args()
+
+    print_summary(compress_tree(args.root, args.jobs or None))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+"""Content-addressed deduplication of the frozen site.
+
+Static files linked by the pages are frozen under their own and under their fingerprinted name, and every slide deck
+carries its own copy of reveal.js and its themes. Files with the same content are found by size and SHA-256 and
+replaced by hard links to one of them, so each content is stored once while all URLs stay as they are. rsync (``-H``)
+and tar keep the links, serve.py maps a linked file into memory once.
+
+Frozen-Flask writes into existing files, freezer.py gives linked files about to be rebuilt their own copy first.
+compress.py and htmlminify.py replace files instead of writing into them, so rebuilding a file never changes its linked
+copies::
+
+    python dedupe.py docs
+"""
+import argparse
+import hashlib
+import os
+import shutil
+import stat
+
+CHUNK_SIZE = 1024 * 1024
+TMP_SUFFIX = '.dedupe-tmp'
+
+
+def content_hash(filename):
+    sha = hashlib.sha256()
+
+    with open(filename, 'rb') as fd:
+        for chunk in iter(lambda: fd.read(CHUNK_SIZE), b''):
+            sha.update(chunk)
+
+    return sha.hexdigest()
+
+
+def find_duplicates(root):
+    """Return sorted lists of non-empty regular files under root with the same content, hidden files excluded. Only
+    files of equal size are hashed, files already linked together only once."""
+    by_size = {}
+
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [name for name in dirnames if not name.startswith('.')]
+
+        for name in filenames:
+            filename = os.path.join(dirpath, name)
+            file_stat = os.lstat(filename)
+
+            if not name.startswith('.') and stat.S_ISREG(file_stat.st_mode) and file_stat.st_size:
+                by_size.setdefault(file_stat.st_size, []).append((filename, (file_stat.st_dev, file_stat.st_ino)))
+
+    by_content = {}
+    hashes = {}
+
+    for size, files in by_size.items():
+        if len(files) < 2:
+            continue
+
+        for filename, inode in files:
+            if inode not in hashes:
+                hashes[inode] = content_hash(filename)
+
+            by_content.setdefault((size, hashes[inode]), []).append(filename)
+
+    return [sorted(files) for files in by_content.values() if len(files) > 1]
+
+
+def same_file(first, second):
+    first, second = os.stat(first), os.stat(second)
+
+    return (first.st_dev, first.st_ino) == (second.st_dev, second.st_ino)
+
+
+def link(source, filename):
+    """Replace filename by a hard link to source, atomically."""
+    tmp_filename = filename + TMP_SUFFIX
+    os.link(source, tmp_filename)
+
+    try:
+        os.replace(tmp_filename, filename)
+    except OSError:
+        os.remove(tmp_filename)
+        raise
+
+
+def unshare(filename):
+    """Give a hard linked file its own copy, before it is written in place."""
+    if os.path.isfile(filename) and os.stat(filename).st_nlink > 1:
+        tmp_filename = filename + TMP_SUFFIX
+        shutil.copy2(filename, tmp_filename)
+        os.replace(tmp_filename, filename)
+
+
+def dedupe_tree(root):
+    """Hard link files with the same content under root to the first of them. Returns a list of (size, files, number
+    of files linked by this run) of every group of identical files."""
+    results = []
+
+    for files in find_duplicates(root):
+        linked = 0
+
+        for filename in files[1:]:
+            if same_file(files[0], filename):
+                continue
+
+            try:
+                link(files[0], filename)
+            except OSError:
+                # No hard links on this file system, the copy stays
+                continue
+
+            linked += 1
+
+        results.append((os.path.getsize(files[0]), files, linked))
+
+    return results
+
+
+def print_summary(results, top=10):
+    """Print the biggest groups of identical files and the bytes saved."""
+    if not results:
+        return
+
+    results = sorted(results, key=lambda result: result[0] * (len(result[1]) - 1), reverse=True)
+
+    for size, files, _linked in results[:top]:
+        print('%-60s %10d bytes x %d' % (files[0], size, len(files)))
+
+    saved = sum(size * (len(files) - 1) for size, files, _linked in results)
+    print('Deduplicated %d files with %d distinct contents (%d linked now): %d bytes saved' % (
+        sum(len(files) for _size, files, _linked in results), len(results),
+        sum(linked for _size, _files, linked in results), saved))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Hard link identical files of the frozen site.')
+    parser.add_argument('root', nargs='?', default='docs', help='directory to deduplicate (default: %(default)s)')
+    parser.add_argument('--top', type=int, default=10, help='number of biggest groups of identical files to list')
+    args = parser.parse_args()
+
+    print_summary(dedupe_tree(args.root), top=args.top)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,225 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+"""Machine-readable event feeds.
+
+The events catalogue from events.py is flattened into a list of feed items, which are serialized as JSON and
+iCalendar here and as Atom by ``templates/events.atom.xml``. Event dates in the catalogue are Slovak day-month strings
+(``'8. december'``) without a year, they are parsed into real dates in Bratislava local time.
+"""
+import json
+import re
+from html import unescape
+from datetime import date, datetime, timedelta
+
+MONTHS = {
+    'január': 1, 'február': 2, 'marec': 3, 'apríl': 4, 'máj': 5, 'jún': 6,
+    'júl': 7, 'august': 8, 'september': 9, 'október': 10, 'november': 11, 'december': 12,
+}
+DATE_RE = re.compile(r'^(?:(?P<day>\d{1,2})\.\s*)?(?P<month>\w+)$')
+UID_DOMAIN = 'spy.pycon.sk'
+BREAK_RE = re.compile(r'<(?:br|/p|/li|/h\d)\b[^>]*>', re.IGNORECASE)
+TAG_RE = re.compile(r'<[^>]+>')
+SPACE_RE = re.compile(r'[ \t\r\f\v]+')
+
+
+def parse_date(year, value):
+    """Parse an event date like '8. december' into (date, day). For a whole month like 'august' day is None and the
+    date is the first day of the month."""
+    match = DATE_RE.match(value.strip())
+
+    if not match or match.group('month') not in MONTHS:
+        raise ValueError('Unknown event date: %r' % value)
+
+    day = match.group('day')
+
+    return date(int(year), MONTHS[match.group('month')], int(day or 1)), day and int(day)
+
+
+def _last_sunday(year, month):
+    day = date(year, month + 1, 1) - timedelta(days=1)
+
+    return day - timedelta(days=(day.weekday() + 1) % 7)
+
+
+def utc_offset(local):
+    """UTC offset of a Europe/Bratislava local datetime: CEST between the last Sundays of March and October."""
+    summer_start = datetime.combine(_last_sunday(local.year, 3), datetime.min.time()) + timedelta(hours=2)
+    summer_end = datetime.combine(_last_sunday(local.year, 10), datetime.min.time()) + timedelta(hours=3)
+
+    return timedelta(hours=2 if summer_start <= local < summer_end else 1)
+
+
+def plain_text(html):
+    """Strip tags from event content for formats without HTML."""
+    text = unescape(TAG_RE.sub('', BREAK_RE.sub('\n', html)))
+
+    return '\n'.join(filter(None, (SPACE_RE.sub(' ', line).strip() for line in text.splitlines())))
+
+
+def feed_items(events, url):
+    """Flatten the events catalogue into feed items, newest first. url is the page the events are listed on."""
+    items = []
+
+    for year in sorted(events, reverse=True):
+        per_day = {}
+
+        for event in events[year]:
+            start, day = parse_date(year, event['date'])
+            item = {
+                'name': event['name'],
+                'year': year,
+                'when': '%s %s%s%s' % (event['date'], year, event.get('hour') and ' - ' + event['hour'] or '',
+                                      event.get('date_end') and ' – %s %s' % (event['date_end'], year) or ''),
+                'url': url,
+                'speakers': [dict(speaker) for speaker in event.get('speakers', ())],
+                'location': dict(event['location']) if event.get('location', {}).get('name') else None,
+                'content': event.get('content', ''),
+            }
+
+            if event.get('date_end'):
+                item['start'] = start
+                item['end'] = parse_date(year, event['date_end'])[0] + timedelta(days=1)
+            elif day is None:
+                item['start'] = start
+                item['end'] = (start + timedelta(days=31)).replace(day=1)
+            elif event.get('hour'):
+                hour, minute = (int(part) for part in event['hour'].split(':'))
+                local = datetime.combine(start, datetime.min.time()).replace(hour=hour, minute=minute)
+                item['start'] = local
+                item['utc_start'] = local - utc_offset(local)
+                item['end'] = None
+            else:
+                item['start'] = start
+                item['end'] = start + timedelta(days=1)
+
+            # Events have no ids, the date and order within the day are stable across languages
+            number = per_day[start] = per_day.get(start, 0) + 1
+            item['uid'] = '%s-%d@%s' % (start.strftime('%Y%m%d'), number, UID_DOMAIN)
+            items.append(item)
+
+    return items
+
+
+def isoformat(value):
+    """ISO 8601 date, or datetime with the Bratislava UTC offset."""
+    if not isinstance(value, datetime):
+        return value.isoformat()
+
+    offset = int(utc_offset(value).total_seconds()) // 3600
+
+    return value.isoformat() + '+%02d:00' % offset
+
+
+def rfc3339(value):
+    """Date-time for Atom, dates are taken as midnight in Bratislava."""
+    if not isinstance(value, datetime):
+        value = datetime.combine(value, datetime.min.time())
+
+    return isoformat(value)
+
+
+def updated(items):
+    """UTC datetime the feed items were last updated: the start of the newest event. It is derived from the data, so
+    the feeds do not change with file modification times of a fresh checkout."""
+    newest = datetime(1970, 1, 1)
+
+    for item in items:
+        local = item['start']
+
+        if not isinstance(local, datetime):
+            local = datetime.combine(local, datetime.min.time())
+
+        newest = max(newest, local - utc_offset(local))
+
+    return newest
+
+
+def to_json(items, lang):
+    events = []
+
+    for item in items:
+        events.append({
+            'id': item['uid'],
+            'name': item['name'],
+            'start': isoformat(item['start']),
+            # All-day events end on the last day, not on the exclusive iCalendar end date
+            'end': item['end'] and isoformat(item['end'] - timedelta(days=1)),
+            'all_day': 'utc_start' not in item,
+            'url': item['url'],
+            'speakers': [{'name': speaker['name'], 'url': speaker.get('link') or None} for speaker in item['speakers']],
+            'location': item['location'] and {
+                'name': item['location']['name'],
+                'address': item['location'].get('address'),
+                'url': item['location'].get('link') or None,
+            },
+            'description': item['content'],
+        })
+
+    return json.dumps({'lang': lang, 'events': events}, ensure_ascii=False, sort_keys=True)
+
+
+def _ics_escape(value):
+    return value.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,').replace('\n', '\\n')
+
+
+def _ics_fold(line):
+    """Fold a content line into chunks of at most 75 octets, as required by RFC 5545."""
+    encoded = line.encode('utf-8')
+    chunks = []
+
+    while len(encoded) > 75:
+        cut = 75 if not chunks else 74
+
+        # Do not split a multi-byte character
+        while encoded[cut] & 0xC0 == 0x80:
+            cut -= 1
+
+        chunks.append(encoded[:cut].decode('utf-8'))
+        encoded = encoded[cut:]
+
+    chunks.append(encoded.decode('utf-8'))
+
+    return '\r\n '.join(chunks)
+
+
+def to_ics(items, lang, calendar_name, stamp):
+    """iCalendar of the feed items. stamp is the UTC datetime the items were last updated, see updated()."""
+    lines = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        'PRODID:-//SPy o.z.//spy.pycon.sk//%s' % lang.upper(),
+        'CALSCALE:GREGORIAN',
+        'X-WR-CALNAME:%s' % _ics_escape(calendar_name),
+    ]
+
+    for item in items:
+        lines.extend([
+            'BEGIN:VEVENT',
+            'UID:%s' % item['uid'],
+            'DTSTAMP:%s' % stamp.strftime('%Y%m%dT%H%M%SZ'),
+        ])
+
+        if 'utc_start' in item:
+            lines.append('DTSTART:%s' % item['utc_start'].strftime('%Y%m%dT%H%M%SZ'))
+        else:
+            lines.append('DTSTART;VALUE=DATE:%s' % item['start'].strftime('%Y%m%d'))
+            lines.append('DTEND;VALUE=DATE:%s' % item['end'].strftime('%Y%m%d'))
+
+        description = plain_text(item['content'])
+
+        if item['speakers']:
+            description = ', '.join(speaker['name'] for speaker in item['speakers']) + '\n\n' + description
+
+        lines.append('SUMMARY:%s' % _ics_escape(item['name']))
+        lines.append('DESCRIPTION:%s' % _ics_escape(description))
+
+        if item['location']:
+            lines.append('LOCATION:%s' % _ics_escape(
+                ', '.join(filter(None, (item['location']['name'], item['location'].get('address'))))))
+
+        lines.append('URL:%s' % item['url'])
+        lines.append('END:VEVENT')
+
+    lines.append('END:VCALENDAR')
+
+    return ''.join(_ics_fold(line) + '\r\n' for line in lines)
@@ -0,0 +1,106 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+"""FontAwesome subsetting.
+
+The purged CSS bundle (see styles.py) keeps only the ``fa-*`` icons used by the rendered pages. Their glyphs are cut out
+of the FontAwesome webfont into small WOFF2 and WOFF files in ``static/fonts/subset`` and the ``@font-face`` rule of the
+bundle is pointed at them, so the original fonts in all six formats are no longer needed by the frozen site.
+
+Requires fontTools and brotli (``pip install fonttools brotli``), without them the bundle keeps the original fonts.
+"""
+import os
+import re
+
+try:
+    from fontTools import subset
+except ImportError:  # fontTools is needed only to build the subset
+    subset = None
+
+SRC_DIR = os.path.abspath(os.path.dirname(__file__))
+FONTS_DIR = os.path.join(SRC_DIR, 'static', 'fonts')
+SOURCE = os.path.join(FONTS_DIR, 'fontawesome-webfont.ttf')
+OUTPUT_DIR = os.path.join(FONTS_DIR, 'subset')
+OUTPUT_NAME = 'fontawesome-webfont'
+FLAVORS = (('woff2', 'woff2'), ('woff', 'woff'))
+# Original files replaced by the subset, relative to the static folder
+ORIGINALS = tuple('fonts/' + name for name in (
+    'FontAwesome.otf', 'fontawesome-webfont.eot', 'fontawesome-webfont.svg', 'fontawesome-webfont.ttf',
+    'fontawesome-webfont.woff', 'fontawesome-webfont.woff2'))
+SUBSET_URL = '../fonts/subset/'
+
+FONT_FACE_RE = re.compile(r'@font-face{font-family:\'?FontAwesome\'?;[^}]*}')
+# FontAwesome icons live in the Unicode private use area
+ICON_RE = re.compile(r'content:["\']\\(f[0-9a-f]{3})["\']')
+
+
+def icons(css):
+    """Return codepoints of all icons used in css."""
+    return sorted(set(int(codepoint, 16) for codepoint in ICON_RE.findall(css)))
+
+
+def _write(filename, data):
+    if os.path.isfile(filename):
+        with open(filename, 'rb') as fd:
+            if fd.read() == data:
+                return
+
+    with open(filename, 'wb') as fd:
+        fd.write(data)
+
+
+def build_subset(codepoints):
+    """Write WOFF2 and WOFF files with only the given codepoints. Returns {flavor: size in bytes}."""
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    sizes = {}
+
+    for flavor, extension in FLAVORS:
+        options = subset.Options()
+        options.flavor = flavor
+        options.notdef_outline = True
+        # FontForge timestamps, not needed by browsers
+        options.drop_tables += ['FFTM']
+        font = subset.load_font(SOURCE, options)
+        subsetter = subset.Subsetter(options)
+        subsetter.populate(unicodes=codepoints)
+        subsetter.subset(font)
+        filename = os.path.join(OUTPUT_DIR, '%s.%s' % (OUTPUT_NAME, extension))
+        tmp_filename = filename + '.tmp'
+        subset.save_font(font, tmp_filename, options)
+
+        with open(tmp_filename, 'rb') as fd:
+            data = fd.read()
+
+        os.remove(tmp_filename)
+        _write(filename, data)
+        sizes[flavor] = len(data)
+
+    return sizes
+
+
+def build(css):
+    """Build the font subset for the icons used in css. Returns {flavor: size in bytes}, empty when fontTools is
+    missing or css uses no icons."""
+    codepoints = icons(css)
+
+    if subset is None or not codepoints or not FONT_FACE_RE.search(css):
+        return {}
+
+    return build_subset(codepoints)
+
+
+def use_subset(css):
+    """Point the FontAwesome @font-face in css at the subset."""
+    src = ','.join("url('%s%s.%s') format('%s')" % (SUBSET_URL, OUTPUT_NAME, extension, flavor)
+                   for flavor, extension in FLAVORS)
+
+    return FONT_FACE_RE.sub(
+        "@font-face{font-family:'FontAwesome';src:%s;font-weight:normal;font-style:normal}" % src, css)
+
+
+def uses_subset(css_filename):
+    """Whether the stylesheet links the subset instead of the original fonts."""
+    if not os.path.isfile(css_filename):
+        return False
+
+    with open(css_filename, encoding='utf-8') as fd:
+        return SUBSET_URL in fd.read()
@@ -1,21 +1,363 @@
-from flask_frozen import Freezer
-from views import app
+import argparse
+import multiprocessing
+import os
+import time
+import warnings
+from unicodedata import normalize
+from urllib.parse import unquote, urlsplit
 
-LANGUAGES = (
-    {'lang_code': 'sk'},
-    {'lang_code': 'en'}
-)
+from flask import url_for
+from assets import split_fingerprint
+from compress import compress_tree, print_summary as print_compress_summary
+from dedupe import dedupe_tree, print_summary as print_dedupe_summary, unshare
+from htmlminify import print_summary as print_minify_summary
+from flask_frozen import Freezer, MissingURLGeneratorWarning, walk_directory
+import fonts
+import images
+import styles
+from jinjacache import precompile
+from incremental import BuildManifest, MANIFEST_FILENAME, file_hash
+from events import get_events
+from views import app, LANGS, page_cache, static_fingerprint, stylesheets, html_minifier, get_sitemap_chunks
 
 app.config['FREEZER_DESTINATION'] = 'docs'  # GitHub pages directory for static site
+app.config['FREEZER_DESTINATION_IGNORE'] = ['CNAME', MANIFEST_FILENAME, '*.gz', '*.br']
+app.config['LANDING_FALLBACK'] = True
 
-freezer = Freezer(app)
+freezer = Freezer(app, with_static_files=False)
+# Sitemap parts are frozen only when the sitemap is split, see sitemap_page()
+warnings.filterwarnings('ignore', r'Nothing frozen for endpoints sitemap_page\. ', MissingURLGeneratorWarning)
+manifest = None
 
 
 @freezer.register_generator
-def index():
-    for lang in LANGUAGES:
-        yield lang
+def lang_pages():
+    """Every GET rule taking only lang_code, in every language from LANGS."""
+    for rule in app.url_map.iter_rules():
+        if 'GET' in rule.methods and rule.arguments == {'lang_code'}:
+            for lang in LANGS:
+                yield rule.endpoint, {'lang_code': lang}
+
+
+@freezer.register_generator
+def events_year():
+    """Events fragments of every year in every language."""
+    for lang in LANGS:
+        for year in get_events(lang):
+            yield {'lang_code': lang, 'year': year}
+
+
+@freezer.register_generator
+def static_files():
+    """Every static file under its own name.
+
+    Names are yielded as plain URLs, because url_for() would fingerprint them. Fingerprinted names are frozen only for
+    files the pages link through url_for('static', ...), Frozen-Flask follows those calls, and for files the CSS
+    bundle links (see stylesheet_files()). Responsive image variants are linked only these two ways, and original
+    fonts are left out when the pages link the CSS bundle with the font subset.
+    """
+    skip = ()
+
+    if stylesheets.critical_css() is not None and fonts.uses_subset(os.path.join(styles.CSS_DIR, styles.BUNDLE)):
+        skip = fonts.ORIGINALS
+
+    responsive = os.path.relpath(images.OUTPUT_DIR, app.static_folder).replace(os.sep, '/') + '/'
+
+    for filename in sorted(static_fingerprint.manifest()):
+        if filename in skip or filename.startswith(responsive):
+            continue
+
+        yield '%s/%s' % (app.static_url_path, filename)
+
+
+@freezer.register_generator
+def stylesheet_files():
+    """Files the CSS bundle links through url(), like the fonts and the responsive variants of the backgrounds, under
+    the fingerprinted names the CSS build wrote into it."""
+    if stylesheets.critical_css() is None:
+        return
+
+    with open(os.path.join(styles.CSS_DIR, styles.BUNDLE), encoding='utf-8') as fd:
+        css = fd.read()
+
+    for filename in styles.linked_files(css):
+        yield '%s/%s' % (app.static_url_path, filename)
+
+
+@freezer.register_generator
+def sitemap_page():
+    """Parts of the sitemap, linked from sitemap.xml once it turns into a sitemap index. A single part is served as
+    sitemap.xml itself and would only duplicate it."""
+    chunks = get_sitemap_chunks()
+
+    if len(chunks) > 1:
+        for page in range(1, len(chunks) + 1):
+            yield {'page': page}
+
+
+def static_source(url):
+    """Return the source file of a static file URL, or None for other URLs."""
+    endpoint, values = app.url_map.bind('').match(url)
+
+    if endpoint != 'static':
+        return None
+
+    filename, _digest = split_fingerprint(app.static_folder, values['filename'])
+
+    return os.path.join(app.static_folder, *filename.split('/'))
+
+
+def static_unchanged(url, filename):
+    """Return True if url is a static file already frozen with the same content.
+
+    Size and modification time are compared first, the content hash only when the frozen copy is older than its source.
+    """
+    source = static_source(url)
+
+    if source is None or not os.path.isfile(filename):
+        return False
+
+    source_stat, frozen_stat = os.stat(source), os.stat(filename)
+
+    if source_stat.st_size != frozen_stat.st_size:
+        return False
+
+    return frozen_stat.st_mtime >= source_stat.st_mtime or file_hash(source) == file_hash(filename)
+
+
+def skip_existing(url, filename):
+    """FREEZER_SKIP_EXISTING callback: skip unchanged static files and, in incremental mode, unchanged pages.
+
+    Frozen-Flask writes into the existing file, which must not change the copies dedupe.py linked to it.
+    """
+    if static_unchanged(url, filename):
+        return True
+
+    if manifest and manifest.skip(url, filename):
+        return True
+
+    unshare(filename)
+
+    return False
+
+
+app.config['FREEZER_SKIP_EXISTING'] = skip_existing
+
+
+def _calls_to_urls(calls):
+    """Convert url_for() calls logged while rendering pages to (url, endpoint) pairs, like Frozen-Flask does."""
+    script_name = freezer._script_name()
+
+    with app.test_request_context(base_url=script_name or None):
+        for endpoint, values in calls:
+            url = unquote(url_for(endpoint, **values))[len(script_name):]
+            parsed_url = urlsplit(url)
+
+            if parsed_url.scheme or parsed_url.netloc:
+                raise ValueError('External URLs not supported: ' + url)
+
+            yield parsed_url.path, endpoint
+
+
+def _build(url, last_modified=None):
+    """Render a single URL in a worker process. Returns the url_for() calls made so the parent can follow them and
+    the HTML minification sizes."""
+    start = time.perf_counter()
+    filename = freezer._build_one(url, last_modified)
+    duration = time.perf_counter() - start
+    calls = list(freezer.url_for_logger.iter_calls())
+    entry = manifest.finish(url) if manifest else None
+
+    return url, filename, duration, calls, entry, html_minifier.stats.get(url)
+
+
+def _init_worker(destination, minify, incremental):
+    """Pool initializer applying the settings of main(). Workers started by spawn or forkserver (the default outside
+    Linux) import this module afresh and would freeze into the default destination otherwise."""
+    global manifest
+    app.config['FREEZER_DESTINATION'] = destination
+    app.config['HTML_MINIFY'] = minify
+
+    if incremental and manifest is None:
+        manifest = BuildManifest(app, freezer)
+        manifest.load()
+
+
+def freeze_serial():
+    """Freeze the site in this process with Frozen-Flask. Returns a list of (url, filename, duration).
+
+    Only building a page is timed, the URL generators run between the pages and would be charged to the page before.
+    """
+    timings = []
+    durations = {}
+    build_one = freezer._build_one
+
+    def timed_build_one(url, last_modified=None):
+        start = time.perf_counter()
+
+        try:
+            return build_one(url, last_modified)
+        finally:
+            durations[url] = time.perf_counter() - start
+
+    freezer._build_one = timed_build_one
+
+    try:
+        for page in freezer.freeze_yield():
+            timings.append((page.url, os.path.join(freezer.root, page.path), durations[page.url]))
+
+            if manifest:
+                manifest.finish(page.url)
+    finally:
+        del freezer._build_one
+
+    return timings
+
+
+def freeze_parallel(jobs):
+    """Freeze the site using a pool of jobs worker processes.
+
+    Every page is rendered by the same Freezer._build_one() as in the serial build, so the output is identical. URLs
+    discovered through url_for() calls in the rendered pages are built in further rounds until nothing new shows up.
+    Private methods of Frozen-Flask are used, its version is pinned in requirements.txt.
+    """
+    remove_extra = app.config['FREEZER_REMOVE_EXTRA_FILES']
+
+    if not os.path.isdir(freezer.root):
+        os.makedirs(freezer.root)
+
+    if remove_extra:
+        ignore = app.config['FREEZER_DESTINATION_IGNORE']
+        previous_files = set(normalize('NFC', os.path.join(freezer.root, *name.split('/')))
+                             for name in walk_directory(freezer.root, ignore=ignore))
+
+    seen_urls = set()
+    seen_endpoints = set()
+    built_files = set()
+    timings = []
+    pending = []
+
+    for url, endpoint, last_modified in freezer._generate_all_urls():
+        seen_endpoints.add(endpoint)
+
+        if url not in seen_urls:
+            seen_urls.add(url)
+            pending.append((url, last_modified))
+
+    initargs = (app.config['FREEZER_DESTINATION'], app.config['HTML_MINIFY'], manifest is not None)
+
+    with multiprocessing.Pool(jobs, initializer=_init_worker, initargs=initargs) as pool:
+        while pending:
+            # Frozen-Flask creates missing directories without exist_ok, which races between workers.
+            for url, _last_modified in pending:
+                filename = os.path.join(freezer.root, *freezer.urlpath_to_filepath(url).split('/'))
+                os.makedirs(os.path.dirname(filename), exist_ok=True)
+
+            results = pool.starmap(_build, pending)
+            pending = []
+
+            for url, filename, duration, calls, entry, sizes in results:
+                built_files.add(normalize('NFC', filename))
+                timings.append((url, filename, duration))
+
+                if sizes:
+                    html_minifier.stats[url] = sizes
+
+                if entry:
+                    manifest.entries[url] = entry
+
+                for new_url, endpoint in _calls_to_urls(calls):
+                    seen_endpoints.add(endpoint)
+
+                    if new_url not in seen_urls:
+                        seen_urls.add(new_url)
+                        pending.append((new_url, None))
+
+    freezer._check_endpoints(seen_endpoints)
+
+    if remove_extra:
+        for extra_file in previous_files - built_files:
+            os.remove(extra_file)
+            parent = os.path.dirname(extra_file)
+
+            if not os.listdir(parent):
+                os.removedirs(parent)
+
+    return timings
+
+
+def print_summary(timings, wall_time, top=10):
+    """Print the slowest URLs and the overall render time."""
+    total = sum(duration for _url, _filename, duration in timings)
+    print('%-60s %10s' % ('URL', 'ms'))
+
+    for url, _filename, duration in sorted(timings, key=lambda timing: timing[2], reverse=True)[:top]:
+        print('%-60s %10.1f' % (url, duration * 1000))
+
+    print('Frozen %d URLs in %.2f s (render time %.2f s)' % (len(timings), wall_time, total))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Freeze the website into static files.')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='number of worker processes, 0 for one per CPU (default: 1, serial build)')
+    parser.add_argument('-d', '--destination', default=app.config['FREEZER_DESTINATION'],
+                        help='output directory (default: %(default)s)')
+    parser.add_argument('-i', '--incremental', action='store_true',
+                        help='skip pages whose inputs did not change since the previous freeze')
+    parser.add_argument('-z', '--compress', action='store_true',
+                        help='write precompressed .gz (and .br if brotli is installed) siblings of text files')
+    parser.add_argument('--dedupe', action='store_true',
+                        help='hard link files with identical content (after compressing, with --compress)')
+    parser.add_argument('--images', action='store_true',
+                        help='build responsive image variants before freezing (requires Pillow)')
+    parser.add_argument('--no-css', action='store_true',
+                        help='do not rebuild the purged CSS bundle and the critical CSS before freezing')
+    parser.add_argument('--no-minify', action='store_true', help='write HTML pages without minifying them')
+    parser.add_argument('--top', type=int, default=10, help='number of slowest URLs to list in the summary')
+    args = parser.parse_args()
+    app.config['FREEZER_DESTINATION'] = args.destination
+    app.config['HTML_MINIFY'] = not args.no_minify
+
+    if args.incremental:
+        global manifest
+        manifest = BuildManifest(app, freezer)
+        manifest.load()
+
+    start = time.perf_counter()
+    jobs = args.jobs or os.cpu_count()
+
+    if args.images:
+        images.build(jobs)
+
+    if not args.no_css:
+        print('CSS: %d -> %d bytes, %d bytes critical' % styles.build(app, freezer.all_urls()))
+        # Pages rendered before the build inline outdated critical CSS
+        page_cache.clear()
+
+    # Report only pages written by this freeze
+    html_minifier.stats.clear()
+
+    # Compile templates once here, the worker processes inherit them
+    precompile(app)
+
+    if jobs > 1:
+        timings = freeze_parallel(jobs)
+    else:
+        timings = freeze_serial()
+
+    if manifest:
+        manifest.save(url for url, _filename, _duration in timings)
+
+    print_summary(timings, time.perf_counter() - start, top=args.top)
+    print_minify_summary(html_minifier.stats, top=args.top)
+
+    if args.compress:
+        print_compress_summary(compress_tree(freezer.root, jobs))
+
+    if args.dedupe:
+        print_dedupe_summary(dedupe_tree(freezer.root), top=args.top)
 
 
 if __name__ == '__main__':
-    freezer.freeze()
+    main()
@@ -0,0 +1,211 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+"""HTML minification.
+
+Comments are removed and whitespace runs are collapsed to a single space, or a single newline when they contain one so
+the frozen pages stay diffable. Whitespace is never removed completely, so inline elements render the same. The content
+of ``<pre>``, ``<textarea>``, ``<script>`` (including JSON-LD) and ``<style>`` elements, conditional comments and
+anything between ``<!-- htmlmin:ignore -->`` and ``<!-- /htmlmin:ignore -->`` is kept as it is.
+
+``HtmlMinifier`` applies it to HTML responses of the app as an ``after_request`` filter, which also minifies pages
+written by the freezer. A strong ETag (from the page cache) is replaced by the hash of the minified body. Already
+frozen pages can be minified with::
+
+    python htmlminify.py docs
+"""
+import argparse
+import hashlib
+import logging
+import os
+import re
+import threading
+from flask import request
+
+logger = logging.getLogger('htmlminify')
+
+TOKEN_RE = re.compile(r'''
+    (?P<ignore><!--\s*htmlmin:ignore\s*-->(?P<ignored>.*?)<!--\s*/htmlmin:ignore\s*-->)
+    |(?P<raw><(?P<raw_tag>pre|textarea|script|style)\b.*?</(?P=raw_tag)\s*>)
+    |(?P<conditional><!--\[if.*?<!\[endif\]-->)
+    |(?P<comment><!--.*?-->)
+    |(?P<tag><(?:[^>"']|"[^"]*"|'[^']*')*>)
+''', re.DOTALL | re.IGNORECASE | re.VERBOSE)
+TAG_PART_RE = re.compile(r'("[^"]*"|\'[^\']*\')|(\s+)')
+SPACE_RE = re.compile(r'\s+')
+# Number of minified pages kept by their ETag
+MEMO_SIZE = 256
+
+
+def _collapse(match):
+    return '\n' if '\n' in match.group(0) else ' '
+
+
+def _minify_tag(tag):
+    """Collapse whitespace between attributes, leaving quoted attribute values alone."""
+    tag = TAG_PART_RE.sub(lambda match: match.group(1) or ' ', tag)
+
+    # The closing > is never quoted, a > in an attribute value is left as it is
+    if tag.endswith(' >'):
+        tag = tag[:-2] + '>'
+
+    if tag.endswith(' />'):
+        tag = tag[:-3] + '/>'
+
+    return tag
+
+
+def minify(html):
+    minified = []
+    text = ''
+    pos = 0
+
+    for match in TOKEN_RE.finditer(html):
+        text += html[pos:match.start()]
+        pos = match.end()
+
+        # Text around a removed comment is collapsed as one run
+        if match.group('comment') is not None:
+            continue
+
+        minified.append(SPACE_RE.sub(_collapse, text))
+        text = ''
+
+        if match.group('ignore') is not None:
+            minified.append(match.group('ignored'))
+        elif match.group('tag') is not None:
+            minified.append(_minify_tag(match.group('tag')))
+        else:
+            minified.append(match.group(0))
+
+    minified.append(SPACE_RE.sub(_collapse, text + html[pos:]))
+
+    return ''.join(minified)
+
+
+class HtmlMinifier(object):
+    """Minifies text/html responses and records their size before and after, per path, in ``stats``.
+
+    Disabled when ``HTML_MINIFY`` is False or the app runs in debug mode.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.stats = {}
+        self._minified = {}
+        self._lock = threading.Lock()
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        app.config.setdefault('HTML_MINIFY', True)
+        app.extensions['html_minifier'] = self
+        app.after_request(self._after_request)
+
+    @property
+    def enabled(self):
+        return self.app.config['HTML_MINIFY'] and not self.app.debug
+
+    def _minify(self, response, etag):
+        """Return (minified data, size before, ETag of the minified data). Pages with a strong ETag are minified
+        once."""
+        if etag in self._minified:
+            return self._minified[etag]
+
+        data = response.get_data()
+        minified = minify(data.decode('utf-8')).encode('utf-8')
+        result = (minified, len(data), hashlib.sha1(minified).hexdigest() if etag else None)
+
+        if etag:
+            with self._lock:
+                if len(self._minified) >= MEMO_SIZE:
+                    self._minified.clear()
+
+                self._minified[etag] = result
+
+        return result
+
+    def _after_request(self, response):
+        if (not self.enabled or response.status_code != 200 or response.mimetype != 'text/html'
+                or response.direct_passthrough or response.is_streamed):
+            return response
+
+        etag, weak = response.get_etag()
+        minified, size, minified_etag = self._minify(response, None if weak else etag)
+        response.set_data(minified)
+        sizes = (size, len(minified))
+
+        if minified_etag:
+            # The conditional request was answered with the ETag of the body before minification
+            response.set_etag(minified_etag)
+            response = response.make_conditional(request)
+
+        with self._lock:
+            self.stats[request.path] = sizes
+
+        logger.debug('%s: %d -> %d bytes', request.path, *sizes)
+
+        return response
+
+
+def minify_file(filename):
+    """Minify a file in place, rewriting it only when it changes. Returns (filename, size before, size after)."""
+    with open(filename, encoding='utf-8') as fd:
+        html = fd.read()
+
+    minified = minify(html)
+
+    if minified != html:
+        # Replaced, not written into, the page may be hard linked by dedupe.py
+        with open(filename + '.tmp', 'w', encoding='utf-8') as fd:
+            fd.write(minified)
+
+        os.replace(filename + '.tmp', filename)
+
+    return filename, len(html.encode('utf-8')), len(minified.encode('utf-8'))
+
+
+def minify_tree(root, exclude=('static',)):
+    """Minify every .html file under root, except in the exclude directories (static files are copied as they
+    are). Returns a list of (filename, size before, size after)."""
+    results = []
+
+    for dirpath, dirnames, filenames in os.walk(root):
+        if dirpath == root:
+            dirnames[:] = [name for name in dirnames if name not in exclude]
+
+        for name in sorted(filenames):
+            if name.endswith('.html'):
+                results.append(minify_file(os.path.join(dirpath, name)))
+
+    return results
+
+
+def print_summary(stats, top=10):
+    """Print total and per-page savings of a {page: (before, after)} mapping."""
+    if not stats:
+        return
+
+    before = sum(sizes[0] for sizes in stats.values())
+    after = sum(sizes[1] for sizes in stats.values())
+
+    for page, (page_before, page_after) in sorted(stats.items(), key=lambda item: item[1][1] - item[1][0])[:top]:
+        print('%-60s %8d -> %8d bytes' % (page, page_before, page_after))
+
+    print('Minified %d HTML pages: %d -> %d bytes (-%.1f %%)' % (
+        len(stats), before, after, 100.0 * (before - after) / before if before else 0))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Minify frozen HTML pages in place.')
+    parser.add_argument('root', nargs='?', default='docs', help='directory with frozen pages (default: %(default)s)')
+    parser.add_argument('--top', type=int, default=10, help='number of pages with the biggest savings to list')
+    args = parser.parse_args()
+
+    results = minify_tree(args.root)
+    print_summary({filename: (before, after) for filename, before, after in results}, top=args.top)
+
+
+if __name__ == '__main__':
+    main()
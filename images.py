@@ -0,0 +1,262 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+"""Responsive image variants.
+
+Images are resized to several widths and recompressed, and WebP (and AVIF when an encoder is available) copies are
+written next to them into ``static/img/responsive``. Results are cached by the hash of the source image, so only new or
+changed images are processed. The ``picture()`` template helper emits ``<picture>`` markup with ``srcset`` for the
+generated variants and falls back to a plain ``<img>`` when there are none. The CSS build (see styles.py) points
+background images at their variants with ``background_image()``.
+
+Requires Pillow (``pip install Pillow``), AVIF needs either Pillow with AVIF support or the ``avifenc`` command.
+"""
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import shutil
+import subprocess
+import tempfile
+from glob import glob
+from flask import url_for
+from markupsafe import Markup, escape
+
+try:
+    from PIL import Image, features
+except ImportError:  # Pillow is needed only to build the variants
+    Image = features = None
+
+SRC_DIR = os.path.abspath(os.path.dirname(__file__))
+STATIC_DIR = os.path.join(SRC_DIR, 'static')
+# (glob pattern, widths), images are also always converted in their original width. Backgrounds already come in
+# small/medium/large files picked by media queries in spy.css, so they are only recompressed.
+SOURCES = (
+    (os.path.join(STATIC_DIR, 'img', 'avatar', '*.jpg'), (100, 200)),
+    (os.path.join(STATIC_DIR, 'img', 'backgrounds', '*.jpg'), ()),
+    (os.path.join(STATIC_DIR, 'img', 'meetup', '*.png'), (320, 640)),
+)
+OUTPUT_DIR = os.path.join(STATIC_DIR, 'img', 'responsive')
+MANIFEST = os.path.join(OUTPUT_DIR, 'manifest.json')
+MIMETYPES = {'avif': 'image/avif', 'webp': 'image/webp', 'jpeg': 'image/jpeg', 'png': 'image/png'}
+EXTENSIONS = {'avif': '.avif', 'webp': '.webp', 'jpeg': '.jpg', 'png': '.png'}
+
+
+def _static_name(path):
+    return os.path.relpath(path, STATIC_DIR).replace(os.sep, '/')
+
+
+def _hash(filename):
+    with open(filename, 'rb') as fd:
+        return hashlib.sha1(fd.read()).hexdigest()
+
+
+def avif_encoder():
+    """Return 'pillow' or 'avifenc' depending on which AVIF encoder is available, or None."""
+    if features is not None and features.check('avif'):
+        return 'pillow'
+
+    if shutil.which('avifenc'):
+        return 'avifenc'
+
+    return None
+
+
+def _save(image, filename, fmt):
+    if fmt == 'jpeg':
+        image.convert('RGB').save(filename, 'JPEG', quality=82, optimize=True, progressive=True)
+    elif fmt == 'png':
+        image.save(filename, 'PNG', optimize=True)
+    elif fmt == 'webp':
+        image.save(filename, 'WEBP', quality=80, method=6)
+    elif avif_encoder() == 'pillow':
+        image.save(filename, 'AVIF', quality=60)
+    else:
+        with tempfile.NamedTemporaryFile(suffix='.png') as tmp:
+            image.save(tmp.name, 'PNG')
+            subprocess.run(['avifenc', '--min', '20', '--max', '40', tmp.name, filename],
+                           check=True, stdout=subprocess.DEVNULL)
+
+
+def build_variants(source, digest, widths):
+    """Write all variants of the source image in the given widths. Returns its manifest entry."""
+    image = Image.open(source)
+    image.load()
+    width, height = image.size
+    original_format = 'png' if image.format == 'PNG' else 'jpeg'
+    formats = [original_format, 'webp']
+
+    if avif_encoder():
+        formats.append('avif')
+
+    name = os.path.splitext(os.path.relpath(source, os.path.join(STATIC_DIR, 'img')))[0]
+    variants = {fmt: [] for fmt in formats}
+
+    for variant_width in sorted(set(w for w in widths if w < width) | {width}):
+        resized = image if variant_width == width else image.resize(
+            (variant_width, round(height * variant_width / width)), Image.LANCZOS)
+
+        fallback_size = None
+
+        for fmt in formats:
+            filename = os.path.join(OUTPUT_DIR, '%s-%s-%d%s' % (name, digest[:8], variant_width, EXTENSIONS[fmt]))
+            os.makedirs(os.path.dirname(filename), exist_ok=True)
+            _save(resized, filename, fmt)
+            size = os.path.getsize(filename)
+
+            if fmt == original_format:
+                if variant_width == width and size > os.path.getsize(source):
+                    # Recompression made it bigger, ship the source as is
+                    shutil.copyfile(source, filename)
+                    size = os.path.getsize(filename)
+
+                fallback_size = size
+            elif size >= fallback_size:
+                # A modern format that does not save anything is not worth an extra <source>
+                os.remove(filename)
+                continue
+
+            variants[fmt].append((variant_width, _static_name(filename)))
+
+    return {'hash': digest, 'width': width, 'height': height, 'format': original_format, 'variants': variants}
+
+
+def _build(source, widths):
+    return _static_name(source), build_variants(source, _hash(source), widths)
+
+
+def _is_cached(entry, digest):
+    return entry and entry['hash'] == digest and all(
+        os.path.isfile(os.path.join(STATIC_DIR, path))
+        for variants in entry['variants'].values() for _width, path in variants)
+
+
+def load_manifest():
+    if os.path.isfile(MANIFEST):
+        with open(MANIFEST) as fd:
+            return json.load(fd)
+
+    return {}
+
+
+def build(jobs=None):
+    """Build variants of all new or changed images, remove stale ones and write the manifest. Returns built sources."""
+    if Image is None:
+        raise RuntimeError('Pillow is required to build responsive images: pip install Pillow')
+
+    manifest = load_manifest()
+    current = {}
+    pending = []
+
+    for pattern, widths in SOURCES:
+        for source in sorted(glob(pattern)):
+            entry = manifest.get(_static_name(source))
+
+            if _is_cached(entry, _hash(source)):
+                current[_static_name(source)] = entry
+            else:
+                pending.append((source, widths))
+
+    if pending:
+        with multiprocessing.Pool(jobs) as pool:
+            current.update(pool.starmap(_build, pending))
+
+    keep = set(path for entry in current.values() for variants in entry['variants'].values()
+               for _width, path in variants)
+
+    for dirpath, _dirnames, filenames in os.walk(OUTPUT_DIR):
+        for name in filenames:
+            filename = os.path.join(dirpath, name)
+
+            if filename != MANIFEST and _static_name(filename) not in keep:
+                os.remove(filename)
+
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+
+    with open(MANIFEST, 'w') as fd:
+        json.dump(current, fd, indent=1, sort_keys=True)
+
+    return [_static_name(source) for source, _widths in pending]
+
+
+_manifest_cache = {'mtime': None, 'data': {}}
+
+
+def _variants(filename):
+    """Return the manifest entry of a static image, reloading the manifest when it changes on disk."""
+    try:
+        mtime = os.path.getmtime(MANIFEST)
+    except OSError:
+        return None
+
+    if _manifest_cache['mtime'] != mtime:
+        _manifest_cache['data'] = load_manifest()
+        _manifest_cache['mtime'] = mtime
+
+    return _manifest_cache['data'].get(filename)
+
+
+def _srcset(variants):
+    return ', '.join('%s %dw' % (url_for('static', filename=path), width) for width, path in variants)
+
+
+def picture(filename, alt='', sizes='100vw', class_=None, **attrs):
+    """Template helper rendering a responsive <picture> for a static image, or a plain <img> without variants."""
+    entry = _variants(filename)
+    attrs['alt'] = alt
+
+    if class_:
+        attrs['class'] = class_
+
+    img_attrs = ' '.join('%s="%s"' % (key, escape(value)) for key, value in sorted(attrs.items()))
+
+    if entry is None:
+        return Markup('<img src="%s" %s/>' % (escape(url_for('static', filename=filename)), img_attrs))
+
+    sources = []
+    fallback = entry['variants'][entry['format']]
+
+    for fmt in ('avif', 'webp'):
+        if entry['variants'].get(fmt):
+            sources.append('<source type="%s" srcset="%s" sizes="%s">' % (
+                MIMETYPES[fmt], escape(_srcset(entry['variants'][fmt])), escape(sizes)))
+
+    return Markup('<picture>%s<img src="%s" srcset="%s" sizes="%s" %s/></picture>' % (
+        ''.join(sources), escape(url_for('static', filename=fallback[-1][1])), escape(_srcset(fallback)),
+        escape(sizes), img_attrs))
+
+
+def background_image(filename, url):
+    """Return CSS declarations pointing background-image at the recompressed variant of a static image in its original
+    width, followed by an image-set() offering the AVIF and WebP variants to browsers supporting it. url maps a static
+    filename to its URL in the stylesheet. Returns None for images without variants."""
+    entry = _variants(filename)
+
+    if entry is None:
+        return None
+
+    fallback = entry['variants'][entry['format']][-1][1]
+    declaration = "background-image:url('%s')" % url(fallback)
+    candidates = ["url('%s') type('%s')" % (url(entry['variants'][fmt][-1][1]), MIMETYPES[fmt])
+                  for fmt in ('avif', 'webp') if entry['variants'].get(fmt)]
+
+    if not candidates:
+        return declaration
+
+    # Browsers without image-set() or type() drop the second declaration and keep the first
+    candidates.append("url('%s') type('%s')" % (url(fallback), MIMETYPES[entry['format']]))
+
+    return '%s;background-image:image-set(%s)' % (declaration, ','.join(candidates))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build responsive variants of images in static/img.')
+    parser.add_argument('-j', '--jobs', type=int, default=0, help='number of worker processes, 0 for one per CPU')
+    args = parser.parse_args()
+
+    built = build(args.jobs or None)
+    print('Built variants of %d images (AVIF encoder: %s)' % (len(built), avif_encoder() or 'none'))
+
+
+if __name__ == '__main__':
+    main()
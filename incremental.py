@@ -0,0 +1,174 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+"""Incremental freezing support.
+
+While a page is frozen we record everything it was built from: the template chain, the translation catalog of its
+language, the application sources, the static files it links to and the settings changing the output. The next freeze
+compares content hashes of those inputs and the settings and skips pages whose inputs have not changed.
+"""
+import hashlib
+import json
+import os
+from flask import request, template_rendered, request_started
+from jinja2 import meta
+
+from assets import split_fingerprint
+from pagecache import watched_files
+
+SRC_DIR = os.path.abspath(os.path.dirname(__file__))
+MANIFEST_FILENAME = '.freeze-manifest.json'
+APP_SOURCES = ('views.py', 'events.py', 'feeds.py', 'htmlminify.py', 'images.py', 'styles.py',
+               'static/img/responsive/manifest.json', 'static/css/critical.min.css')
+# Config values the frozen files depend on
+APP_SETTINGS = ('HTML_MINIFY',)
+
+
+def file_hash(filename, _cache={}):
+    """Return the sha1 of the file content or None if the file does not exist. Hashes are memoized per process."""
+    if filename not in _cache:
+        try:
+            with open(filename, 'rb') as fd:
+                _cache[filename] = hashlib.sha1(fd.read()).hexdigest()
+        except OSError:
+            _cache[filename] = None
+
+    return _cache[filename]
+
+
+def _mtimes(filenames):
+    try:
+        return tuple(os.stat(filename).st_mtime_ns for filename in filenames)
+    except OSError:
+        return None
+
+
+def _find_templates(app, name, chain):
+    if name in chain:
+        return
+
+    source, filename, _uptodate = app.jinja_loader.get_source(app.jinja_env, name)
+    chain[name] = filename
+
+    for parent in meta.find_referenced_templates(app.jinja_env.parse(source)):
+        if parent:
+            _find_templates(app, parent, chain)
+
+
+def template_chain(app, name, _cache={}):
+    """Return {name: filename} of template name and all templates it extends or includes. Parsing the templates is
+    slow, chains are memoized per process until one of their files changes."""
+    if name in _cache:
+        mtimes, chain = _cache[name]
+
+        if mtimes is not None and mtimes == _mtimes(chain.values()):
+            return dict(chain)
+
+    chain = {}
+    _find_templates(app, name, chain)
+    _cache[name] = (_mtimes(chain.values()), chain)
+
+    return dict(chain)
+
+
+class BuildManifest(object):
+    """Records inputs of every frozen URL and decides which URLs can be skipped."""
+
+    def __init__(self, app, freezer):
+        self.app = app
+        self.freezer = freezer
+        self.entries = {}
+        self._current = None
+
+        template_rendered.connect(self._on_template_rendered, app)
+        request_started.connect(self._on_request_started, app)
+        app.url_default_functions.setdefault(None, []).insert(0, self._on_url_for)
+
+    @property
+    def path(self):
+        return os.path.join(self.freezer.root, MANIFEST_FILENAME)
+
+    def load(self):
+        if os.path.isfile(self.path):
+            with open(self.path) as fd:
+                self.entries = json.load(fd)
+
+    def save(self, urls):
+        """Write entries of the given urls, dropping URLs that are no longer part of the site."""
+        entries = {url: self.entries[url] for url in sorted(urls) if url in self.entries}
+
+        with open(self.path, 'w') as fd:
+            json.dump(entries, fd, indent=1, sort_keys=True)
+
+    def _input(self, *path):
+        return os.path.relpath(os.path.join(*path), SRC_DIR)
+
+    def _on_request_started(self, sender, **extra):
+        if self._current is None:
+            return
+
+        view_args = request.view_args or {}
+
+        if request.endpoint == 'static':
+            filename, _digest = split_fingerprint(self.app.static_folder, view_args['filename'])
+            self._current['inputs'].add(self._input(self.app.static_folder, filename))
+        else:
+            for source in APP_SOURCES:
+                self._current['inputs'].add(source)
+
+        if 'lang_code' in view_args:
+            self._current['inputs'].add(
+                self._input(SRC_DIR, 'translations', view_args['lang_code'], 'LC_MESSAGES', 'messages.mo'))
+        elif request.endpoint != 'static':
+            # Pages without a language, like the sitemap, may depend on the templates and catalogs of all languages
+            self._current['inputs'].update(self._input(filename) for filename in watched_files())
+
+    def _on_template_rendered(self, sender, template, context, **extra):
+        if self._current is None:
+            return
+
+        chain = template_chain(self.app, template.name)
+        self._current['inputs'].update(self._input(filename) for filename in chain.values())
+
+    def _on_url_for(self, endpoint, values):
+        if self._current is None:
+            return
+
+        self._current['calls'].append((endpoint, dict(values)))
+
+        if endpoint == 'static' and 'filename' in values:
+            self._current['inputs'].add(self._input(self.app.static_folder, values['filename']))
+
+    def _settings(self):
+        return {name: self.app.config[name] for name in APP_SETTINGS}
+
+    def is_fresh(self, url, filename):
+        """Return True if the frozen file exists and none of the inputs and settings it was built with changed."""
+        entry = self.entries.get(url)
+
+        if entry is None or not os.path.isfile(filename) or entry.get('settings') != self._settings():
+            return False
+
+        return all(file_hash(os.path.join(SRC_DIR, path)) == digest for path, digest in entry['inputs'].items())
+
+    def skip(self, url, filename):
+        """FREEZER_SKIP_EXISTING callback, called by Frozen-Flask before each URL is built."""
+        if self.is_fresh(url, filename):
+            # Replay url_for() calls of the skipped page, so the URLs it links to are still frozen.
+            self.freezer.url_for_logger.logged_calls.extend(tuple(call) for call in self.entries[url]['calls'])
+            self._current = None
+            return True
+
+        self._current = {'inputs': set(), 'calls': []}
+        return False
+
+    def finish(self, url):
+        """Store the inputs recorded while url was built and return its manifest entry."""
+        if self._current is not None:
+            self.entries[url] = {
+                'inputs': {path: file_hash(os.path.join(SRC_DIR, path)) for path in sorted(self._current['inputs'])},
+                'calls': self._current['calls'],
+                'settings': self._settings(),
+            }
+            self._current = None
+
+        return self.entries.get(url)
@@ -0,0 +1,53 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+"""Jinja bytecode cache and ahead-of-time template compilation.
+
+Compiled templates are stored in ``.jinja_cache`` (or the directory from the ``JINJA_CACHE_DIR`` environment
+variable), so fresh worker processes and freezer runs load bytecode instead of parsing and compiling the templates.
+Run this module to compile all templates ahead of time, e.g. during a deploy::
+
+    python jinjacache.py
+"""
+import os
+import time
+from jinja2 import FileSystemBytecodeCache
+
+SRC_DIR = os.path.abspath(os.path.dirname(__file__))
+CACHE_DIR = os.environ.get('JINJA_CACHE_DIR', os.path.join(SRC_DIR, '.jinja_cache'))
+
+
+def bytecode_cache(directory=CACHE_DIR):
+    """Return a filesystem bytecode cache in directory, creating it if needed. Returns None (templates are compiled
+    in every process) when the directory cannot be written, e.g. in a read-only checkout or container image."""
+    try:
+        os.makedirs(directory, exist_ok=True)
+    except OSError:
+        return None
+
+    # Jinja fails rendering when it cannot store the bytecode
+    if not os.access(directory, os.W_OK):
+        return None
+
+    return FileSystemBytecodeCache(directory)
+
+
+def precompile(app):
+    """Compile all templates of app, which stores them in the bytecode cache. Returns the template names."""
+    names = app.jinja_env.list_templates()
+
+    for name in names:
+        app.jinja_env.get_template(name)
+
+    return names
+
+
+def main():
+    from views import app
+
+    start = time.perf_counter()
+    names = precompile(app)
+    print('Compiled %d templates into %s in %.2f s' % (len(names), CACHE_DIR, time.perf_counter() - start))
+
+
+if __name__ == '__main__':
+    main()
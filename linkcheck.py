@@ -0,0 +1,291 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+"""Link audit of the rendered site.
+
+Every page the freezer would write is rendered in all languages and the ``href``/``src`` URLs are collected.
+Internal links are requested from the app, external ones are checked concurrently with a small asyncio HTTP/1.1
+client: ``HEAD`` first (``GET`` when a server refuses it), redirects are followed, at most ``--per-host`` requests run
+against one host at a time over reused keep-alive connections. Results are kept in ``.linkcheck-cache.json``,
+successful checks are trusted for ``--ttl`` seconds and failed links are checked again on every run::
+
+    python linkcheck.py
+    python linkcheck.py --ttl 0 --per-host 2
+"""
+import argparse
+import asyncio
+import json
+import os
+import ssl
+import sys
+import time
+from html.parser import HTMLParser
+from urllib.parse import urljoin, urlsplit
+
+SRC_DIR = os.path.abspath(os.path.dirname(__file__))
+CACHE_FILE = os.path.join(SRC_DIR, '.linkcheck-cache.json')
+USER_AGENT = 'Mozilla/5.0 (compatible; spy-linkcheck/1.0; +https://spy.pycon.sk/)'
+MAX_REDIRECTS = 5
+# Servers refusing HEAD requests, GET is tried instead
+HEAD_REFUSED = (403, 405, 501)
+# Bot protection (LinkedIn answers 999), the link is neither confirmed nor reported as broken
+BLOCKED = (429, 999)
+SKIPPED_SCHEMES = ('mailto', 'tel', 'javascript', 'data')
+
+
+class LinkParser(HTMLParser):
+    """Collects href and src attribute values."""
+
+    def __init__(self):
+        super(LinkParser, self).__init__(convert_charrefs=True)
+        self.links = []
+
+    def handle_starttag(self, tag, attrs):
+        for name, value in attrs:
+            if name in ('href', 'src') and value:
+                self.links.append(value.strip())
+
+
+def extract_links(app, urls):
+    """Render urls and return {absolute or site-relative link: set of pages linking to it}."""
+    client = app.test_client()
+    links = {}
+
+    for page in urls:
+        if page.startswith(app.static_url_path + '/'):
+            continue
+
+        response = client.get(page)
+
+        if response.status_code != 200 or response.mimetype != 'text/html':
+            continue
+
+        parser = LinkParser()
+        parser.feed(response.get_data(as_text=True))
+
+        for link in parser.links:
+            if link.startswith('//'):
+                link = 'https:' + link
+
+            scheme = urlsplit(link).scheme
+
+            if scheme in SKIPPED_SCHEMES:
+                continue
+
+            link = urljoin(page, link).split('#')[0]
+
+            if link:
+                links.setdefault(link, set()).add(page)
+
+    return links
+
+
+def check_internal(app, links):
+    """Request site-relative links from the app. Returns {link: result}."""
+    client = app.test_client()
+    results = {}
+
+    for link in links:
+        response = client.get(link)
+        results[link] = {'status': response.status_code, 'error': None, 'checked': time.time()}
+
+    return results
+
+
+class HttpError(Exception):
+    pass
+
+
+class LinkChecker(object):
+    """Concurrent HEAD/GET checker with per-host limits and keep-alive connection pools."""
+
+    def __init__(self, concurrency=50, per_host=4, timeout=15, ssl_context=None):
+        self.timeout = timeout
+        self.per_host = per_host
+        self.ssl_context = ssl_context or ssl.create_default_context()
+        self._limit = asyncio.Semaphore(concurrency)
+        self._host_limits = {}
+        self._pools = {}
+
+    async def _connect(self, key):
+        scheme, host, port = key
+        secure = scheme == 'https'
+
+        return await asyncio.wait_for(asyncio.open_connection(
+            host, port, ssl=self.ssl_context if secure else None, server_hostname=host if secure else None),
+            self.timeout)
+
+    async def _request(self, method, url):
+        """Send one request and read the response head. Returns (status, headers)."""
+        parts = urlsplit(url)
+
+        if parts.scheme not in ('http', 'https') or not parts.hostname:
+            raise HttpError('Unsupported URL')
+
+        key = (parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == 'https' else 80))
+        path = (parts.path or '/') + ('?' + parts.query if parts.query else '')
+        host = parts.hostname if not parts.port else '%s:%d' % (parts.hostname, parts.port)
+        request = ('%s %s HTTP/1.1\r\nHost: %s\r\nUser-Agent: %s\r\nAccept: */*\r\nConnection: keep-alive\r\n\r\n' % (
+            method, path, host, USER_AGENT)).encode('latin-1')
+        pool = self._pools.setdefault(key, [])
+
+        # A pooled connection may have been closed by the server meanwhile, then a new one is opened once
+        for reused in (True, False):
+            if reused and not pool:
+                continue
+
+            reader, writer = pool.pop() if reused else await self._connect(key)
+
+            try:
+                writer.write(request)
+                head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), self.timeout)
+            except (ConnectionError, asyncio.IncompleteReadError) as exc:
+                writer.close()
+
+                if reused:
+                    continue
+
+                raise HttpError(str(exc) or exc.__class__.__name__)
+            except asyncio.LimitOverrunError:
+                writer.close()
+                raise HttpError('Response head too large')
+            except BaseException:
+                writer.close()
+                raise
+
+            break
+
+        lines = head.decode('latin-1').split('\r\n')
+        version, status = lines[0].split(' ', 2)[:2]
+        headers = {}
+
+        for line in lines[1:]:
+            name, _sep, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        # Bodies are never read, so only bodiless HEAD responses leave a reusable connection
+        if method == 'HEAD' and version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close':
+            pool.append((reader, writer))
+        else:
+            writer.close()
+
+        return int(status), headers
+
+    async def check(self, url):
+        """Return the result of one link: final status or the error."""
+        result = {'status': None, 'error': None, 'checked': time.time()}
+
+        try:
+            for _hop in range(MAX_REDIRECTS + 1):
+                host = urlsplit(url).hostname
+                limit = self._host_limits.setdefault(host, asyncio.Semaphore(self.per_host))
+
+                # Waiting for a busy host must not hold one of the global slots
+                async with limit, self._limit:
+                    status, headers = await self._request('HEAD', url)
+
+                    if status in HEAD_REFUSED:
+                        status, headers = await self._request('GET', url)
+
+                if status in (301, 302, 303, 307, 308) and headers.get('location'):
+                    url = urljoin(url, headers['location'])
+                    result['redirect'] = url
+                    continue
+
+                result['status'] = status
+                break
+            else:
+                result['error'] = 'Too many redirects'
+        except (HttpError, OSError, ValueError, asyncio.TimeoutError) as exc:
+            result['error'] = str(exc) or exc.__class__.__name__
+
+        return result
+
+    async def check_all(self, urls):
+        results = await asyncio.gather(*[self.check(url) for url in urls])
+
+        for pool in self._pools.values():
+            for _reader, writer in pool:
+                writer.close()
+
+        return dict(zip(urls, results))
+
+
+def is_ok(result):
+    return result['error'] is None and result['status'] is not None and result['status'] < 400
+
+
+def is_broken(result):
+    return not is_ok(result) and result['status'] not in BLOCKED
+
+
+def load_cache(filename):
+    if os.path.isfile(filename):
+        with open(filename) as fd:
+            return json.load(fd)
+
+    return {}
+
+
+def save_cache(filename, cache):
+    with open(filename, 'w') as fd:
+        json.dump(cache, fd, indent=1, sort_keys=True)
+
+
+def check_external(urls, cache, ttl, **options):
+    """Check urls not confirmed in the cache within ttl seconds. Returns the number of checked urls, cache is
+    updated in place."""
+    now = time.time()
+    stale = [url for url in urls if url not in cache or not is_ok(cache[url]) or now - cache[url]['checked'] > ttl]
+
+    if stale:
+        async def run():
+            return await LinkChecker(**options).check_all(stale)
+
+        cache.update(asyncio.run(run()))
+
+    return len(stale)
+
+
+def main():
+    from freezer import freezer, app
+
+    parser = argparse.ArgumentParser(description='Check links in the rendered pages of all languages.')
+    parser.add_argument('--ttl', type=int, default=7 * 24 * 3600,
+                        help='seconds a successful check is trusted (default: %(default)s)')
+    parser.add_argument('-c', '--concurrency', type=int, default=50, help='requests in flight (default: %(default)s)')
+    parser.add_argument('--per-host', type=int, default=4, help='requests in flight per host (default: %(default)s)')
+    parser.add_argument('--timeout', type=float, default=15, help='seconds per request (default: %(default)s)')
+    parser.add_argument('--cache', default=CACHE_FILE, help='cache file (default: %(default)s)')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    links = extract_links(app, freezer.all_urls())
+    internal = [link for link in links if not urlsplit(link).scheme]
+    external = [link for link in links if urlsplit(link).scheme]
+    results = check_internal(app, internal)
+    cache = load_cache(args.cache)
+    checked = check_external(external, cache, args.ttl, concurrency=args.concurrency, per_host=args.per_host,
+                             timeout=args.timeout)
+    save_cache(args.cache, cache)
+    results.update((link, cache[link]) for link in external)
+
+    broken = sorted(link for link, result in results.items() if is_broken(result))
+    blocked = sorted(link for link, result in results.items() if result['status'] in BLOCKED)
+
+    for link in broken:
+        result = results[link]
+        print('BROKEN %s (%s)' % (link, result['error'] or result['status']))
+
+        for page in sorted(links[link]):
+            print('    linked from %s' % page)
+
+    print('%d links (%d internal, %d external, %d checked, %d from cache) in %.1f s: %d broken, %d blocked' % (
+        len(links), len(internal), len(external), checked, len(external) - checked, time.perf_counter() - start,
+        len(broken), len(blocked)))
+
+    if broken:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,296 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+"""Load test of the app.
+
+Worker threads send requests for a weighted mix of index pages, support pages, the sitemap and the static files the
+index page links, spread over LANGS with more weight on Slovak and English. By default the app is called in-process
+as a WSGI application, which measures what one worker process sustains, ``--url`` sends the requests to a running
+server over keep-alive connections instead. A warm-up run fills the caches before measuring. Throughput, error rate,
+latency percentiles per kind of URL and a latency histogram are printed and can be written as JSON, a previous result
+passed with ``--compare`` fails the run when throughput or median latency got worse by more than ``--threshold``::
+
+    python loadtest.py -c 8 -d 20 -o load.json
+    python loadtest.py --url http://127.0.0.1:8000 --compare load.json
+"""
+import argparse
+import http.client
+import json
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+from bisect import bisect
+from urllib.parse import urlsplit
+
+from werkzeug.test import EnvironBuilder, run_wsgi_app
+
+from bench import compare, percentile
+from linkcheck import LinkParser
+from views import app, LANGS
+
+# Kinds of URLs and their share of the requests
+URL_MIX = (('index', 50), ('support', 10), ('sitemap', 5), ('static', 35))
+LANG_WEIGHTS = {'sk': 5, 'en': 3}
+# Upper bounds of the latency histogram buckets in milliseconds
+HISTOGRAM_BUCKETS = (0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+def static_urls():
+    """Static files linked from the index page, under the (fingerprinted) names browsers request."""
+    response = app.test_client().get('/%s/index.html' % app.config['BABEL_DEFAULT_LOCALE'])
+    parser = LinkParser()
+    parser.feed(response.get_data(as_text=True))
+
+    return sorted(set(link for link in parser.links if link.startswith(app.static_url_path + '/')))
+
+
+def url_mix(lang_weights):
+    """Return (urls, kinds, cumulative weights) of the request mix."""
+    statics = static_urls()
+    weighted = []
+
+    for kind, weight in URL_MIX:
+        if kind == 'sitemap':
+            weighted.append(('/sitemap.xml', kind, weight))
+        elif kind == 'static':
+            weighted.extend((url, kind, float(weight) / len(statics)) for url in statics)
+        else:
+            total = float(sum(lang_weights.get(lang, 1) for lang in LANGS))
+            weighted.extend(('/%s/%s.html' % (lang, kind), kind, weight * lang_weights.get(lang, 1) / total)
+                            for lang in LANGS)
+
+    cumulative, total = [], 0
+
+    for _url, _kind, weight in weighted:
+        total += weight
+        cumulative.append(total)
+
+    return [url for url, _kind, _weight in weighted], [kind for _url, kind, _weight in weighted], cumulative
+
+
+def wsgi_client():
+    """Return a function requesting a URL from the app in-process and returning the status code."""
+    def send(url):
+        environ = EnvironBuilder(path=url, headers={'Accept-Encoding': 'gzip, br'}).get_environ()
+        app_iter, status, _headers = run_wsgi_app(app.wsgi_app, environ)
+
+        try:
+            for _chunk in app_iter:
+                pass
+        finally:
+            if hasattr(app_iter, 'close'):
+                app_iter.close()
+
+        return int(status.split(' ', 1)[0])
+
+    return send
+
+
+def http_client(base_url):
+    """Return a function requesting a URL from a server over one keep-alive connection."""
+    parts = urlsplit(base_url)
+    connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+    state = {'connection': None}
+
+    def send(url):
+        if state['connection'] is None:
+            state['connection'] = connection_class(parts.hostname, parts.port, timeout=30)
+
+        try:
+            state['connection'].request('GET', parts.path.rstrip('/') + url, headers={'Accept-Encoding': 'gzip, br'})
+            response = state['connection'].getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            state['connection'].close()
+            state['connection'] = None
+            raise
+
+        if response.will_close:
+            state['connection'].close()
+            state['connection'] = None
+
+        return response.status
+
+    return send
+
+
+def worker(make_client, mix, deadline, seed, samples):
+    """Send requests until deadline, appending (kind, seconds, error) to samples."""
+    urls, kinds, cumulative = mix
+    send = make_client()
+    rng = random.Random(seed)
+
+    while time.perf_counter() < deadline:
+        index = bisect(cumulative, rng.random() * cumulative[-1])
+        start = time.perf_counter()
+
+        try:
+            error = send(urls[index]) >= 400
+        except Exception:
+            error = True
+
+        samples.append((kinds[index], time.perf_counter() - start, error))
+
+
+def load(make_client, mix, concurrency, duration, seed=0):
+    """Run concurrency workers for duration seconds. Returns (samples, elapsed seconds)."""
+    samples = []
+    start = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(make_client, mix, start + duration, seed + i, samples))
+               for i in range(concurrency)]
+
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    return samples, time.perf_counter() - start
+
+
+def histogram(durations):
+    """Count durations (seconds) per bucket, keyed by the bucket upper bound in milliseconds."""
+    counts = [0] * (len(HISTOGRAM_BUCKETS) + 1)
+
+    for duration in durations:
+        counts[bisect(HISTOGRAM_BUCKETS, duration * 1000)] += 1
+
+    labels = ['<%g' % bound for bound in HISTOGRAM_BUCKETS] + ['>=%g' % HISTOGRAM_BUCKETS[-1]]
+
+    return dict(zip(labels, counts))
+
+
+def summarize(samples, elapsed):
+    durations = [duration for _kind, duration, _error in samples]
+    errors = sum(1 for _kind, _duration, error in samples if error)
+
+    if not durations:
+        return {'requests': 0, 'errors': 0, 'error_rate': 0.0, 'rps': 0.0}
+
+    return {
+        'requests': len(durations),
+        'errors': errors,
+        'error_rate': float(errors) / len(durations),
+        'rps': len(durations) / elapsed,
+        'p50': percentile(durations, 50) * 1000,
+        'p90': percentile(durations, 90) * 1000,
+        'p99': percentile(durations, 99) * 1000,
+        'max': max(durations) * 1000,
+    }
+
+
+def report(samples, elapsed):
+    kinds = [kind for kind, _weight in URL_MIX]
+
+    return {
+        'total': summarize(samples, elapsed),
+        'kinds': {kind: summarize([sample for sample in samples if sample[0] == kind], elapsed) for kind in kinds},
+        'histogram': histogram([duration for _kind, duration, _error in samples]),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL,
+                                       universal_newlines=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(results):
+    print('%-10s %9s %7s %9s %9s %9s %9s %9s' % ('kind', 'requests', 'errors', 'req/s', 'p50 ms', 'p90 ms', 'p99 ms',
+                                                 'max ms'))
+
+    for name, result in [('total', results['total'])] + sorted(results['kinds'].items()):
+        if result['requests']:
+            print('%-10s %9d %7d %9.1f %9.2f %9.2f %9.2f %9.2f' % (
+                name, result['requests'], result['errors'], result['rps'], result['p50'], result['p90'],
+                result['p99'], result['max']))
+
+    total = max(1, results['total']['requests'])
+
+    for bucket, count in results['histogram'].items():
+        print('%8s ms %7d %s' % (bucket, count, '#' * int(round(60.0 * count / total))))
+
+    print('%.1f requests/s, %.2f %% errors' % (results['total']['rps'], 100 * results['total']['error_rate']))
+
+
+def parse_lang_weights(value):
+    """Parse 'sk=5,en=3' into {'sk': 5.0, 'en': 3.0}."""
+    weights = {}
+
+    for item in value.split(','):
+        lang, _sep, weight = item.partition('=')
+
+        if lang.strip() not in LANGS:
+            raise argparse.ArgumentTypeError('unknown language %r' % lang)
+
+        weights[lang.strip()] = float(weight or 1)
+
+    return weights
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the app in-process or a running server.')
+    parser.add_argument('--url', help='base URL of a running server, the app is called in-process by default')
+    parser.add_argument('-c', '--concurrency', type=int, default=4, help='worker threads (default: %(default)s)')
+    parser.add_argument('-d', '--duration', type=float, default=10, help='seconds to measure (default: %(default)s)')
+    parser.add_argument('-w', '--warmup', type=float, default=2, help='seconds of warm-up (default: %(default)s)')
+    parser.add_argument('--langs', type=parse_lang_weights, default=LANG_WEIGHTS,
+                        help='language weights, others weigh 1 (default: sk=5,en=3)')
+    parser.add_argument('--seed', type=int, default=0, help='random seed of the URL sequence')
+    parser.add_argument('-o', '--output', help='write results as JSON into this file')
+    parser.add_argument('--compare', metavar='BASELINE', help='JSON results of a previous run to compare with')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='allowed slowdown against the baseline, 0.2 means 20 %% (default: %(default)s)')
+    args = parser.parse_args()
+
+    mix = url_mix(args.langs)
+
+    if args.url:
+        def make_client():
+            return http_client(args.url)
+    else:
+        make_client = wsgi_client
+
+    if args.warmup > 0:
+        load(make_client, mix, args.concurrency, args.warmup, args.seed)
+
+    samples, elapsed = load(make_client, mix, args.concurrency, args.duration, args.seed)
+    results = report(samples, elapsed)
+    results['meta'] = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'revision': git_revision(),
+        'target': args.url or 'wsgi',
+        'concurrency': args.concurrency,
+        'duration': args.duration,
+        'langs': {lang: args.langs.get(lang, 1) for lang in LANGS},
+    }
+    print_report(results)
+
+    if args.output:
+        with open(args.output, 'w') as fd:
+            json.dump(results, fd, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as fd:
+            baseline = json.load(fd)
+
+        regressions = compare(results, baseline, args.threshold)
+        rps = baseline.get('total', {}).get('rps')
+
+        if rps and results['total']['rps'] < rps * (1 - args.threshold):
+            regressions.append(('total.rps', rps, results['total']['rps']))
+
+        for metric, previous, value in regressions:
+            print('REGRESSION %s: %.3f -> %.3f' % (metric, previous, value))
+
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,180 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+"""Sampled per-request memory profiling with tracemalloc.
+
+When ``MEMORY_PROFILE`` is enabled (or the ``MEMORY_PROFILE`` environment variable is set to 1), a request starts a
+profiling window with probability ``MEMORY_PROFILE_SAMPLE_RATE``. tracemalloc traces the ``MEMORY_PROFILE_WINDOW``
+requests of the window and is stopped again, so the rest of the traffic runs at full speed. For every traced request
+the peak and the retained memory are added to the statistics of its (endpoint, language). When the window ends, the
+memory still allocated since it started, i.e. retained growth across its requests, is reported with the top allocation
+sites::
+
+    {"requests": 20, "retained": 183402, "top": [{"site": "events.py:52", "size": 74512, "count": 880}, ...]}
+
+Reports are logged as JSON lines to the ``memprofile`` logger, and also appended to ``MEMORY_PROFILE_LOG`` when set.
+In debug mode the collected statistics are served as JSON on ``/_debug/memory``. With a threaded server concurrent
+requests share the traced memory, peaks are exact only with one request per process at a time.
+"""
+import json
+import logging
+import os
+import random
+import threading
+import time
+import tracemalloc
+from flask import abort, current_app, g, jsonify, request
+
+logger = logging.getLogger('memprofile')
+
+# Allocations of the profiler itself and of imports are not interesting
+IGNORED_FILES = (tracemalloc.__file__, '<frozen importlib._bootstrap>', '<frozen importlib._bootstrap_external>')
+
+
+class Profiler(object):
+    """State shared by the requests of a process: the open window and the collected statistics."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.routes = {}
+        self.windows = []
+        self._window = None
+
+    def start(self, config):
+        """Decide whether the current request is traced, opening a window if needed. Returns True when traced."""
+        with self.lock:
+            if self._window is None:
+                if tracemalloc.is_tracing() or random.random() >= config['MEMORY_PROFILE_SAMPLE_RATE']:
+                    # Traced by someone else (e.g. bench.py), their numbers would be mixed with ours
+                    return False
+
+                tracemalloc.start(config['MEMORY_PROFILE_FRAMES'])
+                self._window = {'started': time.time(), 'requests': 0, 'in_flight': 0}
+
+            window = self._window
+
+            if window['requests'] >= config['MEMORY_PROFILE_WINDOW']:
+                return False
+
+            window['requests'] += 1
+            window['in_flight'] += 1
+            tracemalloc.reset_peak()
+
+            return True
+
+    def finish(self, config, key, start_memory):
+        """Record memory of a traced request and close the window after its last request."""
+        current, peak = tracemalloc.get_traced_memory()
+
+        with self.lock:
+            stats = self.routes.setdefault(key, {'requests': 0, 'peak_max': 0, 'peak_total': 0, 'retained_total': 0})
+            stats['requests'] += 1
+            stats['peak_max'] = max(stats['peak_max'], peak - start_memory)
+            stats['peak_total'] += peak - start_memory
+            stats['retained_total'] += current - start_memory
+
+            window = self._window
+            window['in_flight'] -= 1
+
+            if window['requests'] < config['MEMORY_PROFILE_WINDOW'] or window['in_flight']:
+                return
+
+            self._window = None
+            report = self._report(window, config['MEMORY_PROFILE_TOP'])
+            self.windows = (self.windows + [report])[-config['MEMORY_PROFILE_KEEP']:]
+
+        _emit(config, report)
+
+    def _report(self, window, top):
+        snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        snapshot = snapshot.filter_traces([tracemalloc.Filter(False, filename) for filename in IGNORED_FILES])
+        statistics = snapshot.statistics('lineno')
+
+        return {
+            'started': window['started'],
+            'seconds': time.time() - window['started'],
+            'requests': window['requests'],
+            'retained': sum(stat.size for stat in statistics),
+            'top': [{'site': '%s:%d' % (_short_filename(stat.traceback[0].filename), stat.traceback[0].lineno),
+                     'size': stat.size, 'count': stat.count} for stat in statistics[:top]],
+        }
+
+    def summary(self):
+        """Per route statistics with means, and the reports of the last windows."""
+        with self.lock:
+            routes = {}
+
+            for (endpoint, lang), stats in sorted(self.routes.items(), key=lambda item: str(item[0])):
+                routes['%s/%s' % (endpoint, lang)] = dict(
+                    stats, peak_mean=stats['peak_total'] // stats['requests'],
+                    retained_mean=stats['retained_total'] // stats['requests'])
+
+            return {'routes': routes, 'windows': list(self.windows), 'tracing': self._window is not None}
+
+
+profiler = Profiler()
+
+
+def _short_filename(filename):
+    """Path relative to the sources, or to the site-packages directory it is installed in."""
+    src_dir = os.path.abspath(os.path.dirname(__file__))
+
+    if filename.startswith(src_dir + os.sep):
+        return os.path.relpath(filename, src_dir)
+
+    parts = filename.split(os.sep + 'site-packages' + os.sep, 1)
+
+    return parts[-1]
+
+
+def _emit(config, report):
+    line = json.dumps(report)
+    logger.info(line)
+
+    if config['MEMORY_PROFILE_LOG']:
+        with open(config['MEMORY_PROFILE_LOG'], 'a') as fd:
+            fd.write(line + '\n')
+
+
+def enabled():
+    return current_app.config['MEMORY_PROFILE']
+
+
+def _start_request():
+    if enabled() and profiler.start(current_app.config):
+        g.memory_start = tracemalloc.get_traced_memory()[0]
+
+
+def _finish_request(exception=None):
+    # A teardown function, it runs after failed requests too and a window is never left open
+    if 'memory_start' in g:
+        start_memory = g.pop('memory_start')
+        key = (request.endpoint, g.get('current_lang'))
+        profiler.finish(current_app.config, key, start_memory)
+
+
+def memory_report():
+    """Collected statistics as JSON, only in debug mode."""
+    if not current_app.debug:
+        return abort(404)
+
+    return jsonify(profiler.summary())
+
+
+def init_app(app):
+    """Enable memory profiling for app. Call after the other before_request functions are registered, so their
+    allocations are traced too."""
+    app.config.setdefault('MEMORY_PROFILE', os.environ.get('MEMORY_PROFILE') == '1')
+    app.config.setdefault('MEMORY_PROFILE_SAMPLE_RATE', float(os.environ.get('MEMORY_PROFILE_SAMPLE_RATE', 1)))
+    app.config.setdefault('MEMORY_PROFILE_WINDOW', int(os.environ.get('MEMORY_PROFILE_WINDOW', 20)))
+    app.config.setdefault('MEMORY_PROFILE_LOG', os.environ.get('MEMORY_PROFILE_LOG'))
+    app.config.setdefault('MEMORY_PROFILE_TOP', 10)
+    # Traceback depth of allocations, deeper tracebacks cost more
+    app.config.setdefault('MEMORY_PROFILE_FRAMES', 1)
+    app.config.setdefault('MEMORY_PROFILE_KEEP', 20)
+    app.before_request_funcs.setdefault(None, []).insert(0, _start_request)
+    app.teardown_request(_finish_request)
+
+    # Frozen-Flask freezes every rule without arguments, the endpoint is not added unless profiling is enabled
+    if app.config['MEMORY_PROFILE']:
+        app.add_url_rule('/_debug/memory', 'memory_report', memory_report)
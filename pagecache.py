@@ -0,0 +1,148 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+"""In-memory cache of rendered pages.
+
+Pages served by index() and support() depend only on the language, the templates, the source code and the compiled
+translations. Rendered responses are therefore kept per (endpoint, lang) and thrown away as soon as any of those files
+changes on disk. Every response carries a strong ETag of its body and a Last-Modified date of the newest of those files,
+so conditional requests are answered with 304 Not Modified.
+"""
+import hashlib
+import os
+import threading
+import time
+from datetime import datetime
+from functools import wraps
+from glob import glob
+from flask import g, request
+
+SRC_DIR = os.path.abspath(os.path.dirname(__file__))
+WATCHED_FILES = (
+    os.path.join(SRC_DIR, 'templates', '*'),
+    os.path.join(SRC_DIR, 'views.py'),
+    os.path.join(SRC_DIR, 'events.py'),
+    os.path.join(SRC_DIR, 'translations', '*', 'LC_MESSAGES', 'messages.mo'),
+    os.path.join(SRC_DIR, 'static', 'img', 'responsive', 'manifest.json'),
+    os.path.join(SRC_DIR, 'static', 'css', 'critical.min.css'),
+    os.path.join(SRC_DIR, 'static', 'css', 'site.min.css'),
+)
+
+
+def watched_files():
+    """Return the sorted list of files the rendered pages depend on."""
+    files = []
+
+    for pattern in WATCHED_FILES:
+        files.extend(glob(pattern))
+
+    return sorted(files)
+
+
+def files_signature(files):
+    """Return a hashable (path, mtime) snapshot of files, used to detect changes."""
+    signature = []
+
+    for filename in files:
+        try:
+            signature.append((filename, os.stat(filename).st_mtime_ns))
+        except OSError:
+            continue
+
+    return tuple(signature)
+
+
+def signature_last_modified(signature):
+    """Return the newest mtime in a files signature as a datetime with second precision."""
+    newest = max((mtime for _filename, mtime in signature), default=0)
+
+    return datetime.utcfromtimestamp(newest // 10 ** 9)
+
+
+def _page(response, last_modified):
+    """Return the (data, content type, etag, last modified) tuple stored in the cache."""
+    data = response.get_data()
+
+    return data, response.headers.get('Content-Type'), hashlib.sha1(data).hexdigest(), last_modified
+
+
+class PageCache(object):
+    """Cache of rendered responses keyed by (endpoint, lang, view arguments).
+
+    The cache is disabled when ``PAGE_CACHE`` is False or the app runs in debug mode. The watched files are checked
+    at most once per ``PAGE_CACHE_CHECK_INTERVAL`` seconds.
+    """
+
+    def __init__(self, app=None, on_change=None):
+        self.app = None
+        self.on_change = on_change
+        self._pages = {}
+        self._signature = None
+        self._last_modified = None
+        self._checked = 0
+        self._lock = threading.Lock()
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        app.config.setdefault('PAGE_CACHE', True)
+        app.config.setdefault('PAGE_CACHE_CHECK_INTERVAL', 1)
+
+    @property
+    def enabled(self):
+        return self.app.config['PAGE_CACHE'] and not self.app.debug
+
+    def clear(self):
+        with self._lock:
+            self._pages.clear()
+
+    def validate(self):
+        """Drop all cached pages if any of the watched files changed since the last check."""
+        now = time.time()
+
+        if now - self._checked < self.app.config['PAGE_CACHE_CHECK_INTERVAL']:
+            return
+
+        with self._lock:
+            self._checked = now
+            signature = files_signature(watched_files())
+
+            if signature != self._signature:
+                if self._signature is not None and self.on_change:
+                    self.on_change()
+
+                self._signature = signature
+                self._last_modified = signature_last_modified(signature)
+                self._pages.clear()
+
+    def cached(self, view):
+        """Decorator serving the view from the cache when possible and answering conditional requests."""
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if self.enabled:
+                self.validate()
+                key = (request.endpoint, g.get('current_lang'), tuple(sorted((request.view_args or {}).items())))
+                page = self._pages.get(key)
+            else:
+                key = page = None
+
+            if page is None:
+                response = self.app.make_response(view(*args, **kwargs))
+
+                if response.status_code != 200:
+                    return response
+
+                if key is None:
+                    page = _page(response, signature_last_modified(files_signature(watched_files())))
+                else:
+                    page = self._pages[key] = _page(response, self._last_modified)
+
+            data, content_type, etag, last_modified = page
+            response = self.app.response_class(data, content_type=content_type)
+            response.set_etag(etag)
+            response.last_modified = last_modified
+
+            return response.make_conditional(request)
+
+        return wrapper
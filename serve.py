@@ -0,0 +1,380 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+"""Serve the frozen site without Flask and Jinja.
+
+The directory written by freezer.py is scanned once into a route table, URL path -> file with precomputed headers.
+Small files are memory-mapped and written straight from the mapping, big ones (PDFs, slide decks) are sent with
+``sendfile``. Precompressed ``.br``/``.gz`` siblings written by ``freezer.py --compress`` are picked by
+``Accept-Encoding``, and single byte ranges, ``If-None-Match``/``If-Modified-Since`` and ``If-Range`` are supported.
+Connections are kept alive and handled by one asyncio event loop, they are closed after malformed requests, methods
+other than GET and HEAD and requests with a body, which is never read::
+
+    python serve.py docs --port 8000
+
+Send SIGHUP to rescan the directory after freezing again.
+"""
+import argparse
+import asyncio
+import mimetypes
+import mmap
+import os
+import signal
+from email.utils import formatdate, parsedate_to_datetime
+from urllib.parse import unquote, urlsplit
+
+from assets import FINGERPRINT_RE
+
+# Headers framing a request body, a request repeating them is rejected
+BODY_HEADERS = ('content-length', 'transfer-encoding')
+# Files up to this size are served from memory maps, bigger ones with sendfile
+SENDFILE_MIN_SIZE = 64 * 1024
+KEEPALIVE_TIMEOUT = 15
+MAX_HEADER_SIZE = 16 * 1024
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+REASONS = {
+    200: 'OK', 206: 'Partial Content', 301: 'Moved Permanently', 304: 'Not Modified', 400: 'Bad Request',
+    404: 'Not Found', 405: 'Method Not Allowed', 416: 'Range Not Satisfiable',
+}
+
+
+class Body(object):
+    """One representation of a file: the file itself or a precompressed sibling."""
+
+    def __init__(self, filename, encoding=None):
+        stat = os.stat(filename)
+        self.filename = filename
+        self.encoding = encoding
+        self.size = stat.st_size
+        self.mtime = int(stat.st_mtime)
+        self.etag = '"%x-%x%s"' % (self.mtime, self.size, '-' + encoding if encoding else '')
+        # Big files are opened for every response, a shared file position would race between sendfile fallbacks
+        self.view = None
+
+        if 0 < self.size < SENDFILE_MIN_SIZE:
+            with open(filename, 'rb') as fd:
+                self.view = memoryview(mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ))
+        elif not self.size:
+            self.view = memoryview(b'')
+
+
+def shared_body(filename, encoding=None, bodies=None):
+    """Return the Body of filename, one per file when bodies is a dict, for hard links made by dedupe.py."""
+    if bodies is None:
+        return Body(filename, encoding)
+
+    stat = os.stat(filename)
+    key = (stat.st_dev, stat.st_ino, encoding)
+
+    if key not in bodies:
+        bodies[key] = Body(filename, encoding)
+
+    return bodies[key]
+
+
+class Route(object):
+    """A URL of the frozen site with its representations and the headers shared by all of them."""
+
+    def __init__(self, filename, bodies=None):
+        self.identity = shared_body(filename, bodies=bodies)
+        self.variants = {}
+
+        for encoding, extension in ENCODINGS:
+            if os.path.isfile(filename + extension):
+                self.variants[encoding] = shared_body(filename + extension, encoding, bodies)
+
+        content_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+
+        if content_type.startswith('text/') or content_type in ('application/javascript', 'application/json',
+                                                                 'application/xml', 'application/atom+xml'):
+            content_type += '; charset=utf-8'
+
+        self.headers = [
+            ('Content-Type', content_type),
+            ('Last-Modified', formatdate(self.identity.mtime, usegmt=True)),
+            ('Accept-Ranges', 'bytes'),
+        ]
+
+        if self.variants:
+            self.headers.append(('Vary', 'Accept-Encoding'))
+
+        if FINGERPRINT_RE.match(os.path.basename(filename)):
+            self.headers.append(('Cache-Control', 'public, max-age=%d, immutable' % IMMUTABLE_MAX_AGE))
+
+    def body(self, accept_encoding):
+        """Return the best representation for an Accept-Encoding header value."""
+        accepted = {}
+
+        for item in accept_encoding.split(','):
+            coding, _sep, params = item.strip().partition(';')
+            quality = 1.0
+
+            if params.strip().startswith('q='):
+                try:
+                    quality = float(params.strip()[2:])
+                except ValueError:
+                    quality = 0.0
+
+            accepted[coding.strip().lower()] = quality
+
+        for encoding, _extension in ENCODINGS:
+            if encoding in self.variants and accepted.get(encoding, accepted.get('*', 0)) > 0:
+                return self.variants[encoding]
+
+        return self.identity
+
+
+def load_routes(root):
+    """Scan root into a {URL path: Route} table. Precompressed siblings and hidden files are not routes."""
+    routes = {}
+    bodies = {}
+
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [name for name in dirnames if not name.startswith('.')]
+
+        for name in filenames:
+            if name.startswith('.') or name.endswith(tuple(extension for _encoding, extension in ENCODINGS)):
+                continue
+
+            filename = os.path.join(dirpath, name)
+            path = '/' + os.path.relpath(filename, root).replace(os.sep, '/')
+            routes[path] = Route(filename, bodies)
+
+    return routes
+
+
+def parse_range(value, size):
+    """Return (start, end) of a single 'bytes=' range, end exclusive. None means the header is ignored (multiple
+    ranges, other units) and the whole file is sent, (None, None) means it is not satisfiable."""
+    unit, _sep, ranges = value.partition('=')
+
+    if unit.strip() != 'bytes' or ',' in ranges:
+        return None
+
+    first, sep, last = ranges.strip().partition('-')
+
+    try:
+        if not sep:
+            return None
+        elif not first:
+            start, end = max(0, size - int(last)), size
+        else:
+            start, end = int(first), min(size, int(last) + 1) if last else size
+    except ValueError:
+        return None
+
+    if last and first and int(last) < int(first):
+        return None
+
+    if start >= end:
+        return None, None
+
+    return start, end
+
+
+def parse_request(head):
+    """Parse the request line and headers. Returns (method, path, version, {lowercase name: value}) or None."""
+    try:
+        lines = head.decode('latin-1').split('\r\n')
+        method, target, version = lines[0].split(' ')
+    except ValueError:
+        return None
+
+    headers = {}
+
+    for line in lines[1:]:
+        if line:
+            name, sep, value = line.partition(':')
+            name = name.strip().lower()
+
+            if not sep or (name in BODY_HEADERS and name in headers):
+                return None
+
+            headers[name] = value.strip()
+
+    return method, unquote(urlsplit(target).path), version, headers
+
+
+def not_modified(request_headers, body):
+    if 'if-none-match' in request_headers:
+        tags = [tag.strip() for tag in request_headers['if-none-match'].split(',')]
+
+        return '*' in tags or body.etag in tags or 'W/' + body.etag in tags
+
+    if 'if-modified-since' in request_headers:
+        try:
+            return body.mtime <= parsedate_to_datetime(request_headers['if-modified-since']).timestamp()
+        except (TypeError, ValueError):
+            return False
+
+    return False
+
+
+def range_applies(request_headers, body):
+    """If-Range: the range is only used when the validator still matches."""
+    if_range = request_headers.get('if-range')
+
+    if if_range is None:
+        return True
+
+    if if_range.startswith('"'):
+        return if_range == body.etag
+
+    try:
+        return body.mtime == parsedate_to_datetime(if_range).timestamp()
+    except (TypeError, ValueError):
+        return False
+
+
+class FrozenServer(object):
+    """HTTP/1.1 server of a frozen site."""
+
+    def __init__(self, root):
+        self.root = root
+        self.routes = load_routes(root)
+
+    def reload(self):
+        # Old files stay mapped until responses using them finish
+        self.routes = load_routes(self.root)
+
+    def resolve(self, path):
+        """Return (route, redirect location) for a request path."""
+        route = self.routes.get(path + 'index.html' if path.endswith('/') else path)
+
+        if route is None and not path.endswith('/') and path + '/index.html' in self.routes:
+            return None, path + '/'
+
+        return route, None
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), KEEPALIVE_TIMEOUT)
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError, ConnectionError):
+                    break
+
+                request = parse_request(head)
+
+                if request is None:
+                    self.write_head(writer, 400, [('Content-Length', '0'), ('Connection', 'close')])
+                    break
+
+                if not await self.respond(writer, *request):
+                    break
+
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def write_head(self, writer, status, headers):
+        lines = ['HTTP/1.1 %d %s' % (status, REASONS[status]), 'Date: ' + formatdate(usegmt=True)]
+        lines.extend('%s: %s' % header for header in headers)
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+
+    async def respond(self, writer, method, path, version, headers):
+        """Write the response. Returns whether the connection can be kept alive."""
+        connection = headers.get('connection', '').lower()
+        keep_alive = connection == 'keep-alive' if version == 'HTTP/1.0' else connection != 'close'
+
+        # A request body is never read, what follows it on the connection could be taken for another request
+        if 'transfer-encoding' in headers or headers.get('content-length', '0') != '0':
+            keep_alive = False
+
+        connection_header = [('Connection', 'keep-alive' if keep_alive else 'close')]
+
+        if method not in ('GET', 'HEAD'):
+            self.write_head(writer, 405, [('Allow', 'GET, HEAD'), ('Content-Length', '0'), ('Connection', 'close')])
+            return False
+
+        route, location = self.resolve(path)
+
+        if location is not None:
+            self.write_head(writer, 301, [('Location', location), ('Content-Length', '0')] + connection_header)
+            return keep_alive
+
+        if route is None:
+            self.write_head(writer, 404, [('Content-Type', 'text/plain'), ('Content-Length', '9')] + connection_header)
+
+            if method == 'GET':
+                writer.write(b'Not Found')
+
+            return keep_alive
+
+        # Ranges are served from the uncompressed file only
+        byte_range = parse_range(headers['range'], route.identity.size) if 'range' in headers else None
+
+        if byte_range is not None and range_applies(headers, route.identity):
+            body = route.identity
+        else:
+            byte_range = None
+            body = route.body(headers.get('accept-encoding', ''))
+
+        response_headers = route.headers + [('ETag', body.etag)] + connection_header
+
+        if body.encoding:
+            response_headers.append(('Content-Encoding', body.encoding))
+
+        if not_modified(headers, body):
+            self.write_head(writer, 304, response_headers)
+            return keep_alive
+
+        status, start, end = 200, 0, body.size
+
+        if byte_range == (None, None):
+            self.write_head(writer, 416, response_headers + [
+                ('Content-Range', 'bytes */%d' % body.size), ('Content-Length', '0')])
+            return keep_alive
+        elif byte_range is not None:
+            status, (start, end) = 206, byte_range
+            response_headers.append(('Content-Range', 'bytes %d-%d/%d' % (start, end - 1, body.size)))
+
+        self.write_head(writer, status, response_headers + [('Content-Length', str(end - start))])
+
+        if method == 'HEAD' or start == end:
+            return keep_alive
+
+        if body.view is not None:
+            writer.write(body.view[start:end])
+        else:
+            await writer.drain()
+
+            with open(body.filename, 'rb') as fd:
+                await asyncio.get_running_loop().sendfile(writer.transport, fd, start, end - start)
+
+        return keep_alive
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the frozen website.')
+    parser.add_argument('root', nargs='?', default='docs',
+                        help='directory written by freezer.py (default: %(default)s)')
+    parser.add_argument('--host', default=os.environ.get('FLASK_HOST', '127.0.0.1'))
+    parser.add_argument('--port', type=int, default=int(os.environ.get('FLASK_PORT', 8000)))
+    args = parser.parse_args()
+
+    server = FrozenServer(args.root)
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+
+    if hasattr(signal, 'SIGHUP'):
+        loop.add_signal_handler(signal.SIGHUP, server.reload)
+
+    listener = loop.run_until_complete(asyncio.start_server(
+        server.handle, args.host, args.port, limit=MAX_HEADER_SIZE))
+    print('Serving %d files from %s on http://%s:%d/' % (len(server.routes), args.root, args.host, args.port))
+
+    try:
+        loop.run_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        listener.close()
+        loop.run_until_complete(listener.wait_closed())
+        loop.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,36 @@
+// Load events of a year from its fragment the first time its tab is selected
+(function() {
+    var boxes = document.querySelectorAll('.events-lazy');
+
+    var load = function(box) {
+        if (box.getAttribute('data-loaded')) {
+            return;
+        }
+
+        box.setAttribute('data-loaded', '1');
+
+        var xhr = new XMLHttpRequest();
+        xhr.open('GET', box.getAttribute('data-src'));
+        xhr.onload = function() {
+            if (xhr.status === 200) {
+                box.innerHTML = xhr.responseText;
+            } else {
+                box.removeAttribute('data-loaded');
+            }
+        };
+        xhr.onerror = function() {
+            box.removeAttribute('data-loaded');
+        };
+        xhr.send();
+    };
+
+    for (var i = 0; i < boxes.length; i++) {
+        (function(box) {
+            var tab = document.getElementById(box.getAttribute('data-tab'));
+
+            tab.addEventListener('change', function() {
+                load(box);
+            });
+        })(boxes[i]);
+    }
+})();
@@ -0,0 +1,426 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+"""Build-time CSS pipeline.
+
+The stylesheets linked from body.html are minified, concatenated and purged of rules whose selectors match nothing in
+the rendered pages of all languages into ``static/css/site.min.css``. Rules needed by the navigation and the first
+section of a page, i.e. everything visible before scrolling, are also written into ``static/css/critical.min.css``.
+body.html inlines the critical CSS into ``<head>`` and loads the bundle asynchronously. Background images with
+responsive variants (see images.py) are replaced by their recompressed copies and AVIF/WebP through ``image-set()``,
+and files linked through ``url()`` get their fingerprinted names (see assets.py), so they are cached as immutable.
+Until the pipeline runs, and in debug mode, the source stylesheets are linked as they are.
+
+Purging is conservative: a selector is kept when every tag, class and id it mentions is used somewhere in the pages,
+pseudo-classes and attribute selectors are ignored.
+"""
+import argparse
+import os
+import posixpath
+import re
+from html.parser import HTMLParser
+from markupsafe import Markup
+
+import fonts
+import images
+
+SRC_DIR = os.path.abspath(os.path.dirname(__file__))
+CSS_DIR = os.path.join(SRC_DIR, 'static', 'css')
+SOURCES = ('picnic.min.css', 'spy.css', 'font-awesome.min.css')
+BUNDLE = 'site.min.css'
+CRITICAL = 'critical.min.css'
+
+COMMENT_OR_STRING_RE = re.compile(r'(/\*.*?\*/)|("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')', re.S)
+PLACEHOLDER_RE = re.compile('\x00(\\d+)\x00')
+GROUPING_RULES = ('@media', '@supports', '@document')
+PSEUDO_ARGS_RE = re.compile(r'\([^()]*\)')
+PSEUDO_RE = re.compile(r'::?[\w-]+')
+ATTRIBUTE_RE = re.compile(r'\[[^\]]*\]')
+COMBINATOR_RE = re.compile(r'[\s>+~]+')
+SIMPLE_SELECTOR_RE = re.compile(r'([.#]?)(-?[_a-zA-Z][\w-]*|\*)')
+KEYFRAMES_RE = re.compile(r'^@(?:-[a-z]+-)?keyframes (\S+)$')
+URL_RE = re.compile(r'url\(([\'"]?)(?!data:|[a-z]+://|/)([^\'")]+)\1\)')
+BACKGROUND_RE = re.compile(r'background-image:url\(([\'"]?)(?!data:|[a-z]+://|/)([^\'")]+)\1\)')
+# Directory of the bundle in the static folder, relative url() references start there
+BUNDLE_BASE = 'css'
+
+
+class Stylesheet(object):
+    """Minified CSS split into (prelude, body) nodes. Strings are replaced by placeholders while parsing, so braces and
+    semicolons inside them do not confuse the parser."""
+
+    def __init__(self, css):
+        self.strings = []
+        self.banners = []
+        self.nodes = parse(minify(COMMENT_OR_STRING_RE.sub(self._protect, css)))
+
+    def _protect(self, match):
+        comment, string = match.groups()
+
+        if comment is not None:
+            # Keep license banners
+            if comment.startswith('/*!') or (not self.banners and match.start() == 0):
+                self.banners.append(comment)
+
+            return ''
+
+        self.strings.append(string)
+
+        return '\x00%d\x00' % (len(self.strings) - 1)
+
+    def restore(self, css):
+        return PLACEHOLDER_RE.sub(lambda match: self.strings[int(match.group(1))], css)
+
+
+def minify(css):
+    """Minify CSS with comments and strings already removed."""
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{};,>])\s*', r'\1', css)
+    css = re.sub(r'([:(])\s+', r'\1', css)
+    css = re.sub(r'\s+\)', ')', css)
+
+    return css.replace(';}', '}').strip()
+
+
+def _block_end(css, start):
+    """Return the index just past the brace closing the block opened at css[start]."""
+    depth = 0
+
+    for index in range(start, len(css)):
+        if css[index] == '{':
+            depth += 1
+        elif css[index] == '}':
+            depth -= 1
+
+            if depth == 0:
+                return index + 1
+
+    raise ValueError('Unbalanced braces in CSS')
+
+
+def parse(css):
+    """Split minified CSS into (prelude, body) nodes. body is a list of nodes for grouping at-rules like @media, a
+    string for other rules and None for statements like @import."""
+    nodes = []
+    pos = 0
+
+    while pos < len(css):
+        brace = css.find('{', pos)
+        semicolon = css.find(';', pos)
+
+        if brace == -1 or -1 < semicolon < brace:
+            end = len(css) if semicolon == -1 else semicolon + 1
+            statement = css[pos:end].strip()
+
+            if statement.strip(';'):
+                nodes.append((statement.rstrip(';') + ';', None))
+
+            pos = end
+            continue
+
+        end = _block_end(css, brace)
+        prelude, body = css[pos:brace].strip(), css[brace + 1:end - 1]
+
+        if prelude.startswith(GROUPING_RULES):
+            body = parse(body)
+
+        nodes.append((prelude, body))
+        pos = end
+
+    return nodes
+
+
+def serialize(nodes):
+    css = []
+
+    for prelude, body in nodes:
+        if body is None:
+            css.append(prelude)
+        elif isinstance(body, list):
+            inner = serialize(body)
+
+            if inner:
+                css.append('%s{%s}' % (prelude, inner))
+        else:
+            css.append('%s{%s}' % (prelude, body))
+
+    return ''.join(css)
+
+
+def split_selectors(prelude):
+    """Split a selector list on commas outside of parentheses."""
+    selectors = []
+    depth = 0
+    current = ''
+
+    for char in prelude:
+        if char == ',' and depth == 0:
+            selectors.append(current)
+            current = ''
+            continue
+
+        depth += (char == '(') - (char == ')')
+        current += char
+
+    return selectors + [current]
+
+
+def selector_used(selector, used):
+    """Whether every tag, class and id in selector is in the used set ('div', '.tab', '#home')."""
+    previous = None
+
+    while previous != selector:
+        previous, selector = selector, PSEUDO_ARGS_RE.sub('', selector)
+
+    selector = PSEUDO_RE.sub('', ATTRIBUTE_RE.sub('', selector))
+
+    for compound in COMBINATOR_RE.split(selector):
+        for prefix, name in SIMPLE_SELECTOR_RE.findall(compound):
+            if name != '*' and prefix + (name if prefix else name.lower()) not in used:
+                return False
+
+    return True
+
+
+def purge(nodes, used):
+    """Drop style rules and selectors that match nothing in used."""
+    purged = []
+
+    for prelude, body in nodes:
+        if isinstance(body, list):
+            purged.append((prelude, purge(body, used)))
+        elif body is None or prelude.startswith('@'):
+            purged.append((prelude, body))
+        else:
+            selectors = [selector for selector in split_selectors(prelude) if selector_used(selector, used)]
+
+            if selectors:
+                purged.append((','.join(selectors), body))
+
+    return purged
+
+
+def _style_bodies(nodes):
+    for prelude, body in nodes:
+        if isinstance(body, list):
+            for inner in _style_bodies(body):
+                yield inner
+        elif body is not None and not prelude.startswith('@'):
+            yield body
+
+
+def drop_unreferenced(nodes, stylesheet):
+    """Drop @keyframes and @font-face rules whose name is not used by any remaining style rule."""
+    bodies = stylesheet.restore(' '.join(_style_bodies(nodes)))
+    kept = []
+
+    for prelude, body in nodes:
+        keyframes = KEYFRAMES_RE.match(prelude)
+
+        if keyframes and keyframes.group(1) not in bodies:
+            continue
+
+        if prelude == '@font-face':
+            family = re.search(r'font-family:([^;]+)', stylesheet.restore(body))
+
+            if family and family.group(1).strip('\'"') not in bodies:
+                continue
+
+        kept.append((prelude, body))
+
+    return kept
+
+
+def absolute_urls(css, base):
+    """Resolve relative url() references against base, for CSS moved out of its stylesheet."""
+    return URL_RE.sub(lambda match: 'url(%s%s%s)' % (
+        match.group(1), posixpath.normpath(posixpath.join(base, match.group(2))), match.group(1)), css)
+
+
+def responsive_backgrounds(css, base):
+    """Point background images of css in the base directory of the static folder at their responsive variants."""
+    def replace(match):
+        filename = posixpath.normpath(posixpath.join(base, match.group(2)))
+        declarations = images.background_image(filename, lambda variant: posixpath.relpath(variant, base))
+
+        return declarations or match.group(0)
+
+    return BACKGROUND_RE.sub(replace, css)
+
+
+def fingerprint_urls(css, base, fingerprint):
+    """Replace relative url() references of css in the base directory of the static folder by the names fingerprint
+    returns for them."""
+    def replace(match):
+        quote, url = match.groups()
+        path, suffix = re.match(r'([^?#]*)(.*)', url).groups()
+        filename = fingerprint(posixpath.normpath(posixpath.join(base, path)))
+
+        return 'url(%s%s%s%s)' % (quote, posixpath.relpath(filename, base), suffix, quote)
+
+    return URL_RE.sub(replace, css)
+
+
+def linked_files(css, base=BUNDLE_BASE):
+    """Return static filenames of the relative url() references of css in the base directory of the static folder."""
+    return sorted(set(posixpath.normpath(posixpath.join(base, re.split('[?#]', url)[0]))
+                      for _quote, url in URL_RE.findall(css)))
+
+
+class UsedSelectors(HTMLParser):
+    """Tags, classes and ids used in HTML pages, all of them and those above the fold: from <body> to the second
+    section or the footer."""
+
+    def __init__(self):
+        super(UsedSelectors, self).__init__(convert_charrefs=True)
+        self.used = {'html', 'body'}
+        self.critical = {'html', 'body'}
+        self._above_fold = False
+        self._sections = 0
+
+    def feed_page(self, html):
+        self._above_fold = False
+        self._sections = 0
+        self.feed(html)
+        self.close()
+        self.reset()
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        classes = (attrs.get('class') or '').split()
+
+        if tag == 'body':
+            self._above_fold = True
+        elif tag == 'footer' or 'section' in classes:
+            if tag == 'footer' or self._sections:
+                self._above_fold = False
+
+            self._sections += 1
+
+        names = {tag} | {'.' + name for name in classes}
+
+        if attrs.get('id'):
+            names.add('#' + attrs['id'])
+
+        self.used |= names
+
+        if self._above_fold:
+            self.critical |= names
+
+
+def _write(filename, css):
+    """Write css unless the file already has it, so unchanged output keeps its mtime and cached pages stay valid."""
+    if os.path.isfile(filename):
+        with open(filename, encoding='utf-8') as fd:
+            if fd.read() == css:
+                return
+
+    with open(filename, 'w', encoding='utf-8') as fd:
+        fd.write(css)
+
+
+def build(app, urls):
+    """Render urls, write the purged bundle and the critical CSS. Returns (source, bundle, critical) sizes in bytes."""
+    parser = UsedSelectors()
+    client = app.test_client()
+
+    for url in urls:
+        if url.startswith(app.static_url_path + '/'):
+            continue
+
+        response = client.get(url)
+
+        if response.status_code == 200 and response.mimetype == 'text/html':
+            parser.feed_page(response.get_data(as_text=True))
+
+    bundle, critical, banners = [], [], []
+    source_size = 0
+
+    for name in SOURCES:
+        with open(os.path.join(CSS_DIR, name), encoding='utf-8') as fd:
+            css = fd.read()
+
+        source_size += len(css.encode('utf-8'))
+        stylesheet = Stylesheet(css)
+        banners.extend(stylesheet.banners)
+        bundle.append(stylesheet.restore(serialize(drop_unreferenced(purge(stylesheet.nodes, parser.used),
+                                                                     stylesheet))))
+        critical.append(stylesheet.restore(serialize(drop_unreferenced(purge(stylesheet.nodes, parser.critical),
+                                                                       stylesheet))))
+
+    bundle = '\n'.join(banners) + '\n' + ''.join(bundle)
+    critical = ''.join(critical)
+
+    if fonts.build(bundle):
+        bundle, critical = fonts.use_subset(bundle), fonts.use_subset(critical)
+
+    bundle, critical = responsive_backgrounds(bundle, BUNDLE_BASE), responsive_backgrounds(critical, BUNDLE_BASE)
+    static_fingerprint = app.extensions.get('static_fingerprint')
+
+    if static_fingerprint is not None and static_fingerprint.enabled:
+        bundle = fingerprint_urls(bundle, BUNDLE_BASE, static_fingerprint.fingerprint)
+        critical = fingerprint_urls(critical, BUNDLE_BASE, static_fingerprint.fingerprint)
+
+    sizes = [source_size]
+    # Inlined CSS is resolved against the page, not the stylesheet
+    critical = absolute_urls(critical, app.static_url_path + '/' + BUNDLE_BASE)
+
+    for name, css in ((BUNDLE, bundle), (CRITICAL, critical)):
+        _write(os.path.join(CSS_DIR, name), css)
+        sizes.append(len(css.encode('utf-8')))
+
+    return tuple(sizes)
+
+
+class Stylesheets(object):
+    """Template helper inlining the critical CSS, when the pipeline has been run.
+
+    Disabled when ``CSS_BUNDLE`` is False or the app runs in debug mode.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self._critical = (None, None)
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        app.config.setdefault('CSS_BUNDLE', True)
+        app.add_template_global(self.critical_css)
+
+    @property
+    def enabled(self):
+        return self.app.config['CSS_BUNDLE'] and not self.app.debug
+
+    def critical_css(self):
+        """Return the critical CSS to inline, or None when the bundle should not be used."""
+        if not self.enabled or not os.path.isfile(os.path.join(CSS_DIR, BUNDLE)):
+            return None
+
+        filename = os.path.join(CSS_DIR, CRITICAL)
+
+        try:
+            mtime = os.path.getmtime(filename)
+        except OSError:
+            return None
+
+        if self._critical[0] != mtime:
+            with open(filename, encoding='utf-8') as fd:
+                # A closing tag in a string would end the <style> element
+                self._critical = (mtime, Markup(fd.read().replace('</', '<\\/')))
+
+        return self._critical[1]
+
+
+def main():
+    from freezer import freezer, app
+
+    parser = argparse.ArgumentParser(description='Build the purged CSS bundle and the critical CSS.')
+    parser.parse_args()
+
+    print('CSS: %d -> %d bytes, %d bytes critical' % build(app, freezer.all_urls()))
+
+
+if __name__ == '__main__':
+    main()
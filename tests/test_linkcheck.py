@@ -0,0 +1,130 @@
+# -*- coding: utf8 -*-
+"""Checks of the external link checker against a local stub HTTP server::
+
+    python -m unittest discover tests
+"""
+import asyncio
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from linkcheck import LinkChecker, check_external
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super(StubHandler, self).setup()
+        self.server.connections += 1
+
+    def log_message(self, *args):
+        pass
+
+    def respond(self, status, headers=()):
+        self.server.requests.append((self.command, self.path))
+        self.send_response(status)
+
+        for name, value in headers:
+            self.send_header(name, value)
+
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def do_HEAD(self):
+        if self.path.split('?')[0] == '/ok':
+            self.respond(200)
+        elif self.path == '/no-head':
+            self.respond(405)
+        elif self.path == '/old':
+            self.respond(301, [('Location', '/ok')])
+        elif self.path == '/loop':
+            self.respond(302, [('Location', '/loop')])
+        elif self.path == '/huge':
+            self.respond(200, [('X-Padding', 'x' * 70000)])
+        else:
+            self.respond(404)
+
+    def do_GET(self):
+        self.respond(200 if self.path == '/no-head' else 404)
+
+
+class LinkCheckerTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+        cls.server.daemon_threads = True
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.base_url = 'http://127.0.0.1:%d' % cls.server.server_address[1]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.server.connections = 0
+        self.server.requests = []
+
+    def check_all(self, paths, **options):
+        urls = [self.base_url + path for path in paths]
+        results = asyncio.run(LinkChecker(**options).check_all(urls))
+
+        return [results[url] for url in urls]
+
+    def test_ok(self):
+        result, = self.check_all(['/ok'])
+
+        self.assertEqual(result['status'], 200)
+        self.assertIsNone(result['error'])
+        self.assertEqual(self.server.requests, [('HEAD', '/ok')])
+
+    def test_get_when_head_refused(self):
+        result, = self.check_all(['/no-head'])
+
+        self.assertEqual(result['status'], 200)
+        self.assertEqual(self.server.requests, [('HEAD', '/no-head'), ('GET', '/no-head')])
+
+    def test_broken(self):
+        result, = self.check_all(['/missing'])
+
+        self.assertEqual(result['status'], 404)
+
+    def test_redirect(self):
+        result, = self.check_all(['/old'])
+
+        self.assertEqual(result['status'], 200)
+        self.assertEqual(result['redirect'], self.base_url + '/ok')
+
+    def test_too_many_redirects(self):
+        result, = self.check_all(['/loop'])
+
+        self.assertIsNone(result['status'])
+        self.assertEqual(result['error'], 'Too many redirects')
+
+    def test_connection_reuse(self):
+        results = self.check_all(['/ok', '/missing', '/old', '/ok?again'], per_host=1)
+
+        self.assertEqual([result['status'] for result in results], [200, 404, 200, 200])
+        self.assertEqual(self.server.connections, 1)
+
+    def test_head_too_large(self):
+        huge, ok = self.check_all(['/huge', '/ok'])
+
+        self.assertEqual(huge['error'], 'Response head too large')
+        self.assertEqual(ok['status'], 200)
+
+    def test_cache(self):
+        ok, missing = self.base_url + '/ok', self.base_url + '/missing'
+        cache = {}
+
+        self.assertEqual(check_external([ok, missing], cache, ttl=3600), 2)
+        self.assertEqual(check_external([ok, missing], cache, ttl=3600), 1)
+        self.assertEqual(self.server.requests[-1], ('HEAD', '/missing'))
+        self.assertEqual(check_external([ok, missing], cache, ttl=-1), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
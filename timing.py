@@ -0,0 +1,126 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+"""Per-phase request timing.
+
+When ``SERVER_TIMING`` is enabled (or the ``SERVER_TIMING`` environment variable is set to 1), every request records
+how long its phases took and the response carries a ``Server-Timing`` header, e.g.::
+
+    Server-Timing: before;dur=0.05, locale;dur=0.01, data;dur=0.02, variables;dur=0.03, render;dur=9.87, ...
+
+The same numbers are logged as one JSON line to the ``timing`` logger.
+"""
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from functools import wraps
+from flask import current_app, g, has_request_context, request, before_render_template, template_rendered
+
+logger = logging.getLogger('timing')
+
+
+def enabled():
+    return has_request_context() and current_app.config['SERVER_TIMING']
+
+
+def record(name, duration):
+    """Add duration (in seconds) to phase name of the current request."""
+    timings = g.setdefault('timings', {})
+    timings[name] = timings.get(name, 0) + duration
+
+
+@contextmanager
+def phase(name):
+    """Context manager timing a block of code as phase name."""
+    if not enabled():
+        yield
+        return
+
+    start = time.perf_counter()
+
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
+
+
+def timed(name):
+    """Decorator timing every call of the function as phase name."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with phase(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _start_request():
+    if enabled():
+        g.timing_start = time.perf_counter()
+
+
+def _before_render(sender, template, context, **extra):
+    if enabled():
+        g.setdefault('render_start', []).append(time.perf_counter())
+
+
+def _after_render(sender, template, context, **extra):
+    if enabled() and g.get('render_start'):
+        record('render', time.perf_counter() - g.render_start.pop())
+
+
+def _timed_view(view):
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not enabled():
+            return view(*args, **kwargs)
+
+        start = time.perf_counter()
+
+        try:
+            return view(*args, **kwargs)
+        finally:
+            g.view_end = time.perf_counter()
+            record('view', g.view_end - start)
+
+    return wrapper
+
+
+def _finish_request(response):
+    if not enabled() or 'timing_start' not in g:
+        return response
+
+    now = time.perf_counter()
+
+    if 'view_end' in g:
+        record('response', now - g.view_end)
+
+    record('total', now - g.timing_start)
+    timings = [(name, duration * 1000) for name, duration in g.timings.items()]
+    response.headers['Server-Timing'] = ', '.join('%s;dur=%.2f' % timing for timing in timings)
+    logger.info(json.dumps({
+        'method': request.method,
+        'path': request.path,
+        'endpoint': request.endpoint,
+        'status': response.status_code,
+        'timings': dict(timings),
+    }))
+
+    return response
+
+
+def init_app(app):
+    """Enable timing for app. Call after all views are registered, as every view function gets wrapped."""
+    app.config.setdefault('SERVER_TIMING', os.environ.get('SERVER_TIMING') == '1')
+    # Run first among before_request and last among after_request functions, to cover the other hooks too
+    app.before_request_funcs.setdefault(None, []).insert(0, _start_request)
+    app.after_request_funcs.setdefault(None, []).insert(0, _finish_request)
+    before_render_template.connect(_before_render, app)
+    template_rendered.connect(_after_render, app)
+
+    for endpoint, view in app.view_functions.items():
+        app.view_functions[endpoint] = _timed_view(view)